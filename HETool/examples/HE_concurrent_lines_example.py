@@ -0,0 +1,46 @@
+from hetool.include.hetool import Hetool
+import math
+import random
+import sys
+
+# REGRESSION SCENE: CONCURRENT LINES THROUGH A COMPUTED POINT
+# Several lines are inserted through a common point that is not representable
+# in floating point. The vertex created at the crossing of the first two lines
+# is then found by the next lines through both of its edges, with parameters
+# that differ only by round-off, and the incoming line must be split only
+# once at that vertex. Every scene must end with one vertex at the crossing
+# and two edges for each line, without any closed region.
+
+
+def insertConcurrentLines(_center, _nlines, _seed):
+    random.seed(_seed)
+    Hetool.resetDataStructure()
+
+    cx, cy = _center
+    for k in range(_nlines):
+        angle = random.random() * math.pi
+        dx = 20.0 * math.cos(angle)
+        dy = 20.0 * math.sin(angle)
+        if not Hetool.insertSegment([cx - dx, cy - dy, cx + dx, cy + dy], 0.01):
+            return False
+
+    return (len(Hetool.getPoints()) == 2*_nlines + 1 and
+            len(Hetool.getSegments()) == 2*_nlines and
+            len(Hetool.getPatches()) == 0)
+
+
+def main():
+    center = (10.0 * math.sqrt(3.0), 10.0 * math.sqrt(2.0))
+    failures = 0
+    for nlines in [3, 4, 5]:
+        for seed in range(0, 60):
+            if not insertConcurrentLines(center, nlines, seed):
+                print(f"failed: {nlines} lines, seed {seed}")
+                failures += 1
+
+    print(f"{failures} failed scenes")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() > 0 else 0)
@@ -0,0 +1,113 @@
+from hetool.compgeom.compgeom import CompGeom
+from hetool.geometry.point import Point
+import numpy as np
+import random
+import timeit
+
+# BENCHMARK OF THE BATCH PREDICATES OF COMPGEOM
+# Compares the time spent by the scalar predicates, called in a Python loop,
+# with the time spent by the corresponding NumPy batch predicates.
+
+
+def randomPoints(n):
+    return [Point(random.random(), random.random()) for i in range(n)]
+
+
+def measure(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def report(name, n, scalar, batch):
+    print(f"{name:<28}{n:>8}{scalar*1e3:>12.3f}{batch*1e3:>12.3f}"
+          f"{scalar/batch:>10.1f}x")
+
+
+def benchOrient2d(n, repeat):
+    pa = randomPoints(n)
+    pb = randomPoints(n)
+    pc = randomPoints(n)
+    aa = CompGeom.getCoordsArray(pa)
+    ab = CompGeom.getCoordsArray(pb)
+    ac = CompGeom.getCoordsArray(pc)
+
+    def scalar():
+        for i in range(n):
+            CompGeom.signOrient2d(pa[i], pb[i], pc[i])
+
+    def batch():
+        np.sign(CompGeom.orient2dArray(aa, ab, ac))
+
+    report("orient2d", n, measure(scalar, repeat), measure(batch, repeat))
+
+
+def benchSegmentSegments(n, repeat):
+    p1 = Point(0.2, 0.3)
+    p2 = Point(0.8, 0.6)
+    pts = randomPoints(2*n)
+    segment = np.array([[p1.getX(), p1.getY(), p2.getX(), p2.getY()]])
+    segments = np.hstack((CompGeom.getCoordsArray(pts[0::2]),
+                          CompGeom.getCoordsArray(pts[1::2])))
+
+    def scalar():
+        for i in range(n):
+            CompGeom.computeSegmentSegmentIntersection(
+                p1, p2, pts[2*i], pts[2*i+1])
+
+    def batch():
+        CompGeom.segmentsMayIntersect(segment, segments)
+
+    report("segment x segments", n, measure(scalar, repeat),
+           measure(batch, repeat))
+
+
+def benchPointSegments(n, repeat):
+    pt = Point(0.5, 0.5)
+    pts = randomPoints(2*n)
+    segments = np.hstack((CompGeom.getCoordsArray(pts[0::2]),
+                          CompGeom.getCoordsArray(pts[1::2])))
+
+    def scalar():
+        for i in range(n):
+            CompGeom.getClosestPointSegment(pts[2*i], pts[2*i+1], pt)
+
+    def batch():
+        CompGeom.closestPointSegments(pt.getX(), pt.getY(), segments)
+
+    report("point x segments", n, measure(scalar, repeat),
+           measure(batch, repeat))
+
+
+def benchPointsInPolygon(n, repeat):
+    # star shaped polygon with 64 vertices
+    angles = np.linspace(0.0, 2.0*np.pi, 64, endpoint=False)
+    radius = 0.25 + 0.2*(np.arange(64) % 2)
+    poly = [Point(0.5 + r*np.cos(a), 0.5 + r*np.sin(a))
+            for a, r in zip(angles, radius)]
+    pts = randomPoints(n)
+    polyCoords = CompGeom.getCoordsArray(poly)
+    ptsCoords = CompGeom.getCoordsArray(pts)
+
+    def scalar():
+        for pt in pts:
+            CompGeom.isPointInPolygon(poly, pt)
+
+    def batch():
+        CompGeom.pointsInPolygon(ptsCoords, polyCoords)
+
+    report("points in polygon", n, measure(scalar, repeat),
+           measure(batch, repeat))
+
+
+def main():
+    random.seed(0)
+    print(f"{'predicate':<28}{'n':>8}{'scalar ms':>12}{'batch ms':>12}"
+          f"{'speedup':>11}")
+    for n in [100, 1000, 10000]:
+        benchOrient2d(n, 5)
+        benchSegmentSegments(n, 5)
+        benchPointSegments(n, 5)
+        benchPointsInPolygon(n // 10, 5)
+
+
+if __name__ == "__main__":
+    main()
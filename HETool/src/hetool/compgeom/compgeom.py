@@ -1,19 +1,95 @@
 from hetool.geometry.point import Point
 import math
+import heapq
+from fractions import Fraction
+import numpy as np
 
 
 class CompGeom:
 
     ABSTOL = 1e-7  # Absolute tolerance value
     PI = 3.1415926535897932384626433832975028841971693993751058
-
+    EPSILON = 2.0 ** -53  # Half of the unit in the last place of 1.0
+    CCWERRBOUND = (3.0 + 16.0 * EPSILON) * EPSILON  # Orientation error bound
+    BATCH_MIN = 32  # below this number of pieces the scalar loops are faster
+
+    # Return the oriented twice area formed by three given points.
+    # The floating-point result is returned when its magnitude is larger
+    # than the bound on its rounding error, which is the common case.
+    # Otherwise, the determinant is evaluated exactly, so that the sign of
+    # the returned value is always correct.
+    # Ref.:
+    # J.R. Shewchuk - Adaptive Precision Floating-Point Arithmetic and Fast
+    # Robust Geometric Predicates, Discrete & Computational Geometry,
+    # Vol. 18, pp. 305-363, 1997.
     @staticmethod
     def orient2d(pa, pb, pc):
         acx = pa[0] - pc[0]
         bcx = pb[0] - pc[0]
         acy = pa[1] - pc[1]
         bcy = pb[1] - pc[1]
-        return acx * bcy - acy * bcx
+        detleft = acx * bcy
+        detright = acy * bcx
+        det = detleft - detright
+
+        errbound = CompGeom.CCWERRBOUND * (abs(detleft) + abs(detright))
+        if det > errbound or -det > errbound:
+            return det
+
+        return CompGeom.orient2dExact(pa, pb, pc)
+
+    # Evaluate the oriented twice area formed by three given points with
+    # exact rational arithmetic. The result is rounded to the closest float,
+    # but a nonzero result that underflows keeps its sign.
+    @staticmethod
+    def orient2dExact(pa, pb, pc):
+        acx = Fraction(pa[0]) - Fraction(pc[0])
+        bcx = Fraction(pb[0]) - Fraction(pc[0])
+        acy = Fraction(pa[1]) - Fraction(pc[1])
+        bcy = Fraction(pb[1]) - Fraction(pc[1])
+        det = acx * bcy - acy * bcx
+
+        if det == 0:
+            return 0.0
+        value = float(det)
+        if value == 0.0:
+            value = 5e-324 if det > 0 else -5e-324
+        return value
+
+    # Return the dot product of the vectors from a given point 'pa' to
+    # the points 'pb' and 'pc', with the same floating-point filter as
+    # orient2d, so that the sign of the returned value is always correct.
+    @staticmethod
+    def dot2d(pa, pb, pc):
+        bax = pb[0] - pa[0]
+        cax = pc[0] - pa[0]
+        bay = pb[1] - pa[1]
+        cay = pc[1] - pa[1]
+        dotleft = bax * cax
+        dotright = bay * cay
+        dot = dotleft + dotright
+
+        errbound = CompGeom.CCWERRBOUND * (abs(dotleft) + abs(dotright))
+        if dot > errbound or -dot > errbound:
+            return dot
+
+        return CompGeom.dot2dExact(pa, pb, pc)
+
+    # Evaluate the dot product of dot2d with exact rational arithmetic.
+    @staticmethod
+    def dot2dExact(pa, pb, pc):
+        bax = Fraction(pb[0]) - Fraction(pa[0])
+        cax = Fraction(pc[0]) - Fraction(pa[0])
+        bay = Fraction(pb[1]) - Fraction(pa[1])
+        cay = Fraction(pc[1]) - Fraction(pa[1])
+        dot = bax * cax + bay * cay
+
+        if dot == 0:
+            return 0.0
+        value = float(dot)
+        if value == 0.0:
+            value = 5e-324 if dot > 0 else -5e-324
+        return value
 
     # Return the sign (NEGATIVE, ZERO, or POSITIVE) of the oriented
     # twice area formed by three given points.
@@ -67,25 +143,20 @@ class CompGeom:
 
     # Return the sign (NEGATIVE, ZERO, or POSITIVE) of the oriented
     # twice area formed by three given points.
-    # This function uses conventional floating-point operations to
-    # compute the area and compares the area result with a hard-coded
-    # very small tolerance value (ABSTOL).
+    # The sign is the exact one given by orient2d: only truly collinear
+    # points are classified as ZERO. Points that are close to each other or
+    # to a segment must be merged by the caller, with its own tolerance.
     @staticmethod
     def signArea2d(_p1, _p2, _p3):
-        det = Point.area2d(_p1, _p2, _p3)
-        if abs(det) < CompGeom.ABSTOL:
-            return "ZERO"
-        if det > 0.0:
-            return "POSITIVE"
-        return "NEGATIVE"
+        return CompGeom.signOrient2d(_p1, _p2, _p3)
 
     # Return the signed value of the oriented twice area formed by
     # three given points.
-    # This function uses conventional floating-point operations to
-    # compute the signed area.
+    # The value is the one given by orient2d, so that its sign is always
+    # the one returned by signArea2d.
     @staticmethod
     def valArea2d(_p1,  _p2, _p3):
-        return Point.area2d(_p1, _p2, _p3)
+        return CompGeom.valOrient2d(_p1, _p2, _p3)
 
     # Get closest point on line 'p1'-'p2'.
     # Returns the distance between given point and closest point.
@@ -271,20 +342,30 @@ class CompGeom:
     # Its main used is to classify the points of two collinear segments,
     # but it may be used to classify points projected at the infinite line
     # that contains a segment.
+    # The position is classified with the exact signs of dot products, so
+    # a point is only at an end point of the segment when its projection
+    # coincides with it.
     @staticmethod
     def getPtPosWrtSegment(_p1, _p2, _p):
+        p1 = [_p1.getX(), _p1.getY()]
+        p2 = [_p2.getX(), _p2.getY()]
+        p = [_p.getX(), _p.getY()]
+        dot1 = CompGeom.dot2d(p1, p2, p)
+        dot2 = CompGeom.dot2d(p2, p1, p)
+
+        if dot1 == 0.0:
+            return 'START_SEG', 0.0  # At start point of segment
+        elif dot2 == 0.0:
+            return 'END_SEG', 1.0   # At end point of segment
+
         v12 = _p2 - _p1
         v1p = _p - _p1
         # Get parametric value of project point on segment line
         _t = Point.dotprod(v12, v1p) / Point.sizesquare(v12)
 
-        if abs(_t) < CompGeom.ABSTOL:
-            return 'START_SEG', _t  # At start point of segment
-        elif abs(_t-1.0) < CompGeom.ABSTOL:
-            return 'END_SEG', _t   # At end point of segment
-        elif _t < 0.0:
+        if dot1 < 0.0:
             return 'BEFORE_SEG', _t   # Outside and before segment
-        elif _t > 1.0:
+        elif dot2 < 0.0:
             return 'AFTER_SEG', _t   # Outside and after segment
         return 'INSIDE_SEG', _t   # Inside segment
 
@@ -333,6 +414,11 @@ class CompGeom:
         n = len(_poly)  # number of polygon points
         ni = 0  # number of intersections
 
+        if n >= CompGeom.BATCH_MIN:
+            inside = CompGeom.pointsInPolygon(
+                np.array([[x, y]]), CompGeom.getCoordsArray(_poly))
+            return bool(inside[0])
+
         for i in range(0, n):
             p1 = _poly[i]  # first point of current line segment
             p2 = _poly[(i+1) % n]  # second point of current line segment
@@ -674,578 +760,692 @@ class CompGeom:
         # verifies for each pair of possible segments if they intersect, and
         # stores for both segments the parametric coordinate where intersection occurs
         iStatus = False
-        segONETotalLength = 0.0
-        segTWOTotalLength = 0.0
         intersecParams = []
         params = []
         pts = []
-        for i in range(0, len(_poly)-1):
-            segONEPartialLength = Point.euclidiandistance(
-                _poly[i], _poly[i + 1])
-            segTWOTotalLength = segONETotalLength + segONEPartialLength
-            segTWOPartialLength = 0.0
-
-            for j in range(i+1, len(_poly)-1):
-                segTWOPartialLength = Point.euclidiandistance(
-                    _poly[j], _poly[j + 1])
-                status, pi, t12, t34 = CompGeom.computeSegmentSegmentIntersection(_poly[i], _poly[i + 1],
-                                                                                  _poly[j], _poly[j + 1])
-
-                if status == 'DO_NOT_INTERSECT':
-                    # do nothing, continue the checking!
+        # computes the arc-length at the start of each piece of the polyline
+        lengths, partials, totalLength = CompGeom.getPieceLengths(_poly)
+
+        # only the pairs of pieces with overlapping bounding boxes may intersect
+        pairs = CompGeom.getOverlappingPieces(_poly)
+        pairs = CompGeom.filterPiecePairs(pairs, _poly, _poly)
+        for i, j in pairs:
+            segONEPartialLength = partials[i]
+            segONETotalLength = lengths[i]
+            segTWOPartialLength = partials[j]
+            segTWOTotalLength = lengths[j]
+            status, pi, t12, t34 = CompGeom.computeSegmentSegmentIntersection(_poly[i], _poly[i + 1],
+                                                                              _poly[j], _poly[j + 1])
+
+            if status == 'DO_NOT_INTERSECT':
+                # do nothing, continue the checking!
+                pass
+            elif status == 'DO_INTERSECT':
+                # the straight segments intersect in the middle!
+                intersecParams.append([
+                    segONETotalLength + t12*segONEPartialLength, pi])
+                intersecParams.append([
+                    segTWOTotalLength + t34*segTWOPartialLength, pi])
+                iStatus = True
+            elif status == 'COLLINEAR':
+                # the straight segments are collinear !
+                pos3_12, t3_12 = CompGeom.getPtPosWrtSegment(
+                    _poly[i], _poly[i + 1], _poly[j])
+                pos4_12, t4_12 = CompGeom.getPtPosWrtSegment(
+                    _poly[i], _poly[i + 1], _poly[j + 1])
+                pos1_34, t1_34 = CompGeom.getPtPosWrtSegment(
+                    _poly[j], _poly[j + 1], _poly[i])
+                pos2_34, t2_34 = CompGeom.getPtPosWrtSegment(
+                    _poly[j], _poly[j + 1], _poly[i + 1])
+
+                if(pos3_12 == 'BEFORE_SEG' and pos4_12 == 'BEFORE_SEG' or
+                   pos3_12 == 'AFTER_SEG' and pos4_12 == 'AFTER_SEG'):
+                    # The two segments do not intercept
                     pass
-                elif status == 'DO_INTERSECT':
-                    # the straight segments intersect in the middle!
-                    intersecParams.append([
-                        segONETotalLength + t12*segONEPartialLength, pi])
-                    intersecParams.append([
-                        segTWOTotalLength + t34*segTWOPartialLength, pi])
-                    iStatus = True
-                elif status == 'COLLINEAR':
-                    # the straight segments are collinear !
-                    pos3_12, t3_12 = CompGeom.getPtPosWrtSegment(
-                        _poly[i], _poly[i + 1], _poly[j])
-                    pos4_12, t4_12 = CompGeom.getPtPosWrtSegment(
-                        _poly[i], _poly[i + 1], _poly[j + 1])
-                    pos1_34, t1_34 = CompGeom.getPtPosWrtSegment(
-                        _poly[j], _poly[j + 1], _poly[i])
-                    pos2_34, t2_34 = CompGeom.getPtPosWrtSegment(
-                        _poly[j], _poly[j + 1], _poly[i + 1])
-
-                    if(pos3_12 == 'BEFORE_SEG' and pos4_12 == 'BEFORE_SEG' or
-                       pos3_12 == 'AFTER_SEG' and pos4_12 == 'AFTER_SEG'):
-                        # The two segments do not intercept
-                        pass
-                    elif((pos3_12 == 'BEFORE_SEG' and pos4_12 == 'START_SEG') or
-                         (pos3_12 == 'START_SEG' and pos4_12 == 'BEFORE_SEG') or
-                         (pos3_12 == 'END_SEG' and pos4_12 == 'AFTER_SEG') or
-                         (pos3_12 == 'AFTER_SEG' and pos4_12 == 'END_SEG')):
-
-                        # Segments simply touch at one end without overlapping
-                        if i == 0 and j == len(_poly)-2:
-                            segONEInterAtParam = segONETotalLength
-                            segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
-                            intersecParams.append(
-                                [segONEInterAtParam, _poly[i]])
-                            intersecParams.append(
-                                [segTWOInterAtParam, _poly[j + 1]])
-                            iStatus = True
-
-                    elif pos3_12 == 'START_SEG' and pos4_12 == 'END_SEG':
-                        # Segments have common end points: just delete second segment.
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength
-
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i]])
+                elif((pos3_12 == 'BEFORE_SEG' and pos4_12 == 'START_SEG') or
+                     (pos3_12 == 'START_SEG' and pos4_12 == 'BEFORE_SEG') or
+                     (pos3_12 == 'END_SEG' and pos4_12 == 'AFTER_SEG') or
+                     (pos3_12 == 'AFTER_SEG' and pos4_12 == 'END_SEG')):
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    # Segments simply touch at one end without overlapping
+                    if i == 0 and j == len(_poly)-2:
+                        segONEInterAtParam = segONETotalLength
                         segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
-
-                        # Store second pair of intersection parameters
                         intersecParams.append(
-                            [segONEInterAtParam, _poly[i + 1]])
+                            [segONEInterAtParam, _poly[i]])
                         intersecParams.append(
-                            [segTWOInterAtParam, _poly[i + 1]])
+                            [segTWOInterAtParam, _poly[j + 1]])
                         iStatus = True
 
-                    elif pos3_12 == 'END_SEG' and pos4_12 == 'START_SEG':
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i]])
+                elif pos3_12 == 'START_SEG' and pos4_12 == 'END_SEG':
+                    # Segments have common end points: just delete second segment.
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i]])
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[j]])
-                        intersecParams.append([segTWOInterAtParam, _poly[j]])
-                        iStatus = True
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
-                    elif pos3_12 == 'BEFORE_SEG' and pos4_12 == 'INSIDE_SEG':
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, _poly[i + 1]])
+                    intersecParams.append(
+                        [segTWOInterAtParam, _poly[i + 1]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i]])
+                elif pos3_12 == 'END_SEG' and pos4_12 == 'START_SEG':
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i]])
 
-                        segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[j+1]])
-                        intersecParams.append([segTWOInterAtParam, _poly[j+1]])
-                        iStatus = True
+                    # Store second pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[j]])
+                    intersecParams.append([segTWOInterAtParam, _poly[j]])
+                    iStatus = True
 
-                    elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'BEFORE_SEG':
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
+                elif pos3_12 == 'BEFORE_SEG' and pos4_12 == 'INSIDE_SEG':
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i]])
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i]])
 
-                        segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength
+                    segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[j]])
-                        intersecParams.append([segTWOInterAtParam, _poly[j]])
-                        iStatus = True
+                    # Store second pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[j+1]])
+                    intersecParams.append([segTWOInterAtParam, _poly[j+1]])
+                    iStatus = True
 
-                    elif pos3_12 == 'BEFORE_SEG' and pos4_12 == 'END_SEG':
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
+                elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'BEFORE_SEG':
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i]])
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i]])
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+                    segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i+1]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i+1]])
-                        iStatus = True
+                    # Store second pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[j]])
+                    intersecParams.append([segTWOInterAtParam, _poly[j]])
+                    iStatus = True
 
-                    elif pos3_12 == 'END_SEG' and pos4_12 == 'BEFORE_SEG':
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
+                elif pos3_12 == 'BEFORE_SEG' and pos4_12 == 'END_SEG':
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i]])
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i]])
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[j]])
-                        intersecParams.append([segTWOInterAtParam, _poly[j]])
-                        iStatus = True
+                    # Store second pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i+1]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i+1]])
+                    iStatus = True
 
-                    elif pos3_12 == 'START_SEG' and pos4_12 == 'INSIDE_SEG':
-                        segONEInterAtParam = segONETotalLength
+                elif pos3_12 == 'END_SEG' and pos4_12 == 'BEFORE_SEG':
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
+
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i]])
+
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength
+
+                    # Store second pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[j]])
+                    intersecParams.append([segTWOInterAtParam, _poly[j]])
+                    iStatus = True
+
+                elif pos3_12 == 'START_SEG' and pos4_12 == 'INSIDE_SEG':
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength
+
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i]])
+
+                    segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+
+                    # Store second pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[j+1]])
+                    intersecParams.append([segTWOInterAtParam, _poly[j+1]])
+                    iStatus = True
+
+                elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'START_SEG':
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i]])
+
+                    segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength
+
+                    # Store second pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[j]])
+                    intersecParams.append([segTWOInterAtParam, _poly[j]])
+                    iStatus = True
+
+                elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'INSIDE_SEG':
+                    if t3_12 < t4_12:
+                        segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
                         segTWOInterAtParam = segTWOTotalLength
 
                         # Store fisrt pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i]])
+                        intersecParams.append(
+                            [segONEInterAtParam, _poly[j]])
+                        intersecParams.append(
+                            [segTWOInterAtParam, _poly[j]])
 
                         segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
                         segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
                         # Store second pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[j+1]])
-                        intersecParams.append([segTWOInterAtParam, _poly[j+1]])
-                        iStatus = True
+                        intersecParams.append(
+                            [segONEInterAtParam, _poly[j+1]])
+                        intersecParams.append(
+                            [segTWOInterAtParam, _poly[j+1]])
 
-                    elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'START_SEG':
-                        segONEInterAtParam = segONETotalLength
+                    else:
+                        segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
                         segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
                         # Store fisrt pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i]])
+                        intersecParams.append(
+                            [segONEInterAtParam, _poly[j+1]])
+                        intersecParams.append(
+                            [segTWOInterAtParam, _poly[j+1]])
 
                         segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
                         segTWOInterAtParam = segTWOTotalLength
 
                         # Store second pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[j]])
-                        intersecParams.append([segTWOInterAtParam, _poly[j]])
-                        iStatus = True
-
-                    elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'INSIDE_SEG':
-                        if t3_12 < t4_12:
-                            segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
-                            segTWOInterAtParam = segTWOTotalLength
-
-                            # Store fisrt pair of intersection parameters
-                            intersecParams.append(
-                                [segONEInterAtParam, _poly[j]])
-                            intersecParams.append(
-                                [segTWOInterAtParam, _poly[j]])
-
-                            segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
-                            segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
-
-                            # Store second pair of intersection parameters
-                            intersecParams.append(
-                                [segONEInterAtParam, _poly[j+1]])
-                            intersecParams.append(
-                                [segTWOInterAtParam, _poly[j+1]])
-
-                        else:
-                            segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
-                            segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
-
-                            # Store fisrt pair of intersection parameters
-                            intersecParams.append(
-                                [segONEInterAtParam, _poly[j+1]])
-                            intersecParams.append(
-                                [segTWOInterAtParam, _poly[j+1]])
-
-                            segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
-                            segTWOInterAtParam = segTWOTotalLength
-
-                            # Store second pair of intersection parameters
-                            intersecParams.append(
-                                [segONEInterAtParam, _poly[j]])
-                            intersecParams.append(
-                                [segTWOInterAtParam, _poly[j]])
-
-                        iStatus = True
+                        intersecParams.append(
+                            [segONEInterAtParam, _poly[j]])
+                        intersecParams.append(
+                            [segTWOInterAtParam, _poly[j]])
 
-                    elif pos3_12 == 'BEFORE_SEG' and pos4_12 == 'AFTER_SEG':
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i]])
+                elif pos3_12 == 'BEFORE_SEG' and pos4_12 == 'AFTER_SEG':
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i]])
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i+1]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i+1]])
-                        iStatus = True
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
 
-                    elif pos3_12 == 'AFTER_SEG' and pos4_12 == 'BEFORE_SEG':
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i+1]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i+1]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i]])
+                elif pos3_12 == 'AFTER_SEG' and pos4_12 == 'BEFORE_SEG':
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i]])
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i+1]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i+1]])
-                        iStatus = True
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
 
-                    elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'END_SEG':
-                        segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i+1]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i+1]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[j]])
-                        intersecParams.append([segTWOInterAtParam, _poly[j]])
+                elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'END_SEG':
+                    segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[j]])
+                    intersecParams.append([segTWOInterAtParam, _poly[j]])
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i+1]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i+1]])
-                        iStatus = True
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
-                    elif pos3_12 == 'END_SEG' and pos4_12 == 'INSIDE_SEG':
-                        segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i+1]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i+1]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[j+1]])
-                        intersecParams.append([segTWOInterAtParam, _poly[j+1]])
+                elif pos3_12 == 'END_SEG' and pos4_12 == 'INSIDE_SEG':
+                    segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[j+1]])
+                    intersecParams.append([segTWOInterAtParam, _poly[j+1]])
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[j]])
-                        intersecParams.append([segTWOInterAtParam, _poly[j]])
-                        iStatus = True
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength
 
-                    elif pos3_12 == 'START_SEG' and pos4_12 == 'AFTER_SEG':
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[j]])
+                    intersecParams.append([segTWOInterAtParam, _poly[j]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i]])
+                elif pos3_12 == 'START_SEG' and pos4_12 == 'AFTER_SEG':
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i]])
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i+1]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i+1]])
-                        iStatus = True
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
 
-                    elif pos3_12 == 'AFTER_SEG' and pos4_12 == 'START_SEG':
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i+1]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i+1]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i]])
+                elif pos3_12 == 'AFTER_SEG' and pos4_12 == 'START_SEG':
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i]])
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i+1]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i+1]])
-                        iStatus = True
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
 
-                    elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'AFTER_SEG':
-                        segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i+1]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i+1]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[j]])
-                        intersecParams.append([segTWOInterAtParam, _poly[j]])
+                elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'AFTER_SEG':
+                    segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[j]])
+                    intersecParams.append([segTWOInterAtParam, _poly[j]])
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i+1]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i+1]])
-                        iStatus = True
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
 
-                    elif pos3_12 == 'AFTER_SEG' and pos4_12 == 'INSIDE_SEG':
-                        segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i+1]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i+1]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[j+1]])
-                        intersecParams.append([segTWOInterAtParam, _poly[j+1]])
+                elif pos3_12 == 'AFTER_SEG' and pos4_12 == 'INSIDE_SEG':
+                    segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[j+1]])
+                    intersecParams.append([segTWOInterAtParam, _poly[j+1]])
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append([segONEInterAtParam, _poly[i+1]])
-                        intersecParams.append([segTWOInterAtParam, _poly[i+1]])
-                        iStatus = True
-                elif status == 'TOUCH':
-                    # one segments touches the other
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
 
-                    # avoid consecutive segments
-                    if j != (i+1):
-                        intersecParams.append(
-                            [segONETotalLength + t12*segONEPartialLength, pi])
-                        intersecParams.append(
-                            [segTWOTotalLength + t34*segTWOPartialLength, pi])
-                        iStatus = True
+                    # Store second pair of intersection parameters
+                    intersecParams.append([segONEInterAtParam, _poly[i+1]])
+                    intersecParams.append([segTWOInterAtParam, _poly[i+1]])
+                    iStatus = True
+            elif status == 'TOUCH':
+                # one segments touches the other
 
-                segTWOTotalLength += segTWOPartialLength
+                # avoid consecutive segments
+                if j != (i+1):
+                    intersecParams.append(
+                        [segONETotalLength + t12*segONEPartialLength, pi])
+                    intersecParams.append(
+                        [segTWOTotalLength + t34*segTWOPartialLength, pi])
+                    iStatus = True
 
-            segONETotalLength += segONEPartialLength
 
-        # removes duplicate elements
-        unique_intersecParams = []
+        # removes duplicate elements (hashing the parameters and coordinates)
+        # and sorts them by the parametric order
+        unique_intersecParams = {}
         for item in intersecParams:
-            if item not in unique_intersecParams:
-                unique_intersecParams.append(item)
-
-        unique_intersecParams.sort()
+            key = (item[0], item[1].getX(), item[1].getY())
+            if key not in unique_intersecParams:
+                unique_intersecParams[key] = item
 
         # Calculate the parameters based on its partial length
-        for it in unique_intersecParams:
-            params.append(it[0]/segONETotalLength)
+        for key in sorted(unique_intersecParams):
+            it = unique_intersecParams[key]
+            params.append(it[0]/totalLength)
             pts.append(it[1])
 
         return iStatus, pts, params
 
+    # Returns the arc-length at the start of each piece of a polyline, the
+    # length of each piece and the total length of the polyline.
+    @staticmethod
+    def getPieceLengths(_poly):
+        lengths = []
+        partials = []
+        totalLength = 0.0
+        for i in range(0, len(_poly)-1):
+            partialLength = Point.euclidiandistance(_poly[i], _poly[i + 1])
+            lengths.append(totalLength)
+            partials.append(partialLength)
+            totalLength += partialLength
+        return lengths, partials, totalLength
+
+    # Returns the pairs (i, j) of pieces of two polylines whose bounding boxes
+    # (enlarged by ABSTOL) overlap. If the second polyline is not given, the
+    # pairs (i, j), with i < j, of pieces of the first polyline are returned.
+    # The pieces are swept along the x direction in increasing order of their
+    # left limits, keeping an active list of the pieces that still reach the
+    # sweep position, so that only pieces that overlap in x are compared.
+    @staticmethod
+    def getOverlappingPieces(_poly1, _poly2=None):
+        if _poly2 is None:
+            polys = (_poly1,)
+        else:
+            polys = (_poly1, _poly2)
+
+        boxes = []
+        for k, poly in enumerate(polys):
+            for i in range(0, len(poly)-1):
+                boxes.append((min(poly[i].getX(), poly[i+1].getX()) - CompGeom.ABSTOL,
+                              max(poly[i].getX(), poly[i+1].getX()) + CompGeom.ABSTOL,
+                              min(poly[i].getY(), poly[i+1].getY()) - CompGeom.ABSTOL,
+                              max(poly[i].getY(), poly[i+1].getY()) + CompGeom.ABSTOL,
+                              k, i))
+        boxes.sort()
+
+        pairs = []
+        active = tuple({} for poly in polys)
+        heap = []
+        for box in boxes:
+            # removes the pieces that end before the sweep position
+            while heap and heap[0][0] < box[0]:
+                xmax, k, i = heapq.heappop(heap)
+                del active[k][i]
+
+            k = box[4]
+            for i, other in active[len(polys)-1-k].items():
+                if other[2] <= box[3] and box[2] <= other[3]:
+                    if k == 0 and _poly2 is None:
+                        pairs.append((min(i, box[5]), max(i, box[5])))
+                    elif k == 0:
+                        pairs.append((box[5], i))
+                    else:
+                        pairs.append((i, box[5]))
+
+            active[k][box[5]] = box
+            heapq.heappush(heap, (box[1], k, box[5]))
+
+        pairs.sort()
+        return pairs
+
+    # Discards the pairs (i, j) of pieces of two polylines that certainly do
+    # not intersect, testing all the pairs at once when there are many of them.
+    @staticmethod
+    def filterPiecePairs(_pairs, _poly1, _poly2):
+        if len(_pairs) < CompGeom.BATCH_MIN:
+            return _pairs
+
+        pieces1 = CompGeom.getPiecesArray(CompGeom.getCoordsArray(_poly1))
+        if _poly2 is _poly1:
+            pieces2 = pieces1
+        else:
+            pieces2 = CompGeom.getPiecesArray(CompGeom.getCoordsArray(_poly2))
+        pairs = np.array(_pairs)
+        mask = CompGeom.segmentsMayIntersect(pieces1[pairs[:, 0]],
+                                             pieces2[pairs[:, 1]])
+        return [_pairs[k] for k in np.nonzero(mask)[0]]
+
     @staticmethod
     def computePolyPolyIntersection(_poly1, _poly2):
 
         # verifies for each pair of possible segments if they intersect, and
         # stores for both segments the parametric coordinate where intersection occurs
-        segONETotalLength = 0.0
         iStatus = False
         intersecParams = []
         param1 = []
         param2 = []
         pts = []
 
-        for i in range(0, len(_poly1)-1):
-            segONEPartialLength = Point.euclidiandistance(
-                _poly1[i], _poly1[i + 1])
-            segTWOPartialLength = 0.0
-            segTWOTotalLength = 0.0
+        # computes the arc-length at the start of each piece of both polylines
+        lengths1, partials1, totalLength1 = CompGeom.getPieceLengths(_poly1)
+        lengths2, partials2, totalLength2 = CompGeom.getPieceLengths(_poly2)
+
+        # only the pairs of pieces with overlapping bounding boxes may intersect
+        pairs = CompGeom.getOverlappingPieces(_poly1, _poly2)
+        pairs = CompGeom.filterPiecePairs(pairs, _poly1, _poly2)
+        for i, j in pairs:
+            segONEPartialLength = partials1[i]
+            segONETotalLength = lengths1[i]
+            segTWOPartialLength = partials2[j]
+            segTWOTotalLength = lengths2[j]
+            status, pi, t12, t34 = CompGeom.computeSegmentSegmentIntersection(
+                _poly1[i], _poly1[i+1], _poly2[j], _poly2[j + 1])
+
+            if status == 'DO_NOT_INTERSECT':
+                # do nothing, continue the checking
+                pass
+            elif status == 'DO_INTERSECT':
+                # the straight segments intersect in the middle!
+                segONEInterAtParam = segONETotalLength + t12*segONEPartialLength
+                segTWOInterAtParam = segTWOTotalLength + t34*segTWOPartialLength
+                intersecParams.append(
+                    [segONEInterAtParam, segTWOInterAtParam, pi])
+                iStatus = True
+
+            elif status == 'COLLINEAR':
+                pos3_12, t3_12 = CompGeom.getPtPosWrtSegment(
+                    _poly1[i], _poly1[i + 1], _poly2[j])
+                pos4_12, t4_12 = CompGeom.getPtPosWrtSegment(
+                    _poly1[i], _poly1[i + 1], _poly2[j + 1])
+                pos1_34, t1_34 = CompGeom.getPtPosWrtSegment(
+                    _poly2[j], _poly2[j + 1], _poly1[i])
+                pos2_34, t2_34 = CompGeom.getPtPosWrtSegment(
+                    _poly2[j], _poly2[j + 1], _poly1[i + 1])
+
+                if ((pos3_12 == 'BEFORE_SEG' and pos4_12 == 'BEFORE_SEG') or
+                        (pos3_12 == 'AFTER_SEG' and pos4_12 == 'AFTER_SEG')):
+                    # The two segments do not intercept
+                    pass
 
-            for j in range(0, len(_poly2)-1):
+                elif pos3_12 == 'BEFORE_SEG' and pos4_12 == 'START_SEG':
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
+                    iStatus = True
 
-                segTWOPartialLength = Point.euclidiandistance(
-                    _poly2[j], _poly2[j + 1])
-                status, pi, t12, t34 = CompGeom.computeSegmentSegmentIntersection(
-                    _poly1[i], _poly1[i+1], _poly2[j], _poly2[j + 1])
+                elif pos3_12 == 'START_SEG' and pos4_12 == 'BEFORE_SEG':
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
+                    iStatus = True
 
-                if status == 'DO_NOT_INTERSECT':
-                    # do nothing, continue the checking
-                    pass
-                elif status == 'DO_INTERSECT':
-                    # the straight segments intersect in the middle!
-                    segONEInterAtParam = segONETotalLength + t12*segONEPartialLength
-                    segTWOInterAtParam = segTWOTotalLength + t34*segTWOPartialLength
+                elif pos3_12 == 'END_SEG' and pos4_12 == 'AFTER_SEG':
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength
                     intersecParams.append(
-                        [segONEInterAtParam, segTWOInterAtParam, pi])
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i+1]])
                     iStatus = True
 
-                elif status == 'COLLINEAR':
-                    pos3_12, t3_12 = CompGeom.getPtPosWrtSegment(
-                        _poly1[i], _poly1[i + 1], _poly2[j])
-                    pos4_12, t4_12 = CompGeom.getPtPosWrtSegment(
-                        _poly1[i], _poly1[i + 1], _poly2[j + 1])
-                    pos1_34, t1_34 = CompGeom.getPtPosWrtSegment(
-                        _poly2[j], _poly2[j + 1], _poly1[i])
-                    pos2_34, t2_34 = CompGeom.getPtPosWrtSegment(
-                        _poly2[j], _poly2[j + 1], _poly1[i + 1])
-
-                    if ((pos3_12 == 'BEFORE_SEG' and pos4_12 == 'BEFORE_SEG') or
-                            (pos3_12 == 'AFTER_SEG' and pos4_12 == 'AFTER_SEG')):
-                        # The two segments do not intercept
-                        pass
-
-                    elif pos3_12 == 'BEFORE_SEG' and pos4_12 == 'START_SEG':
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
-                        iStatus = True
+                elif pos3_12 == 'AFTER_SEG' and pos4_12 == 'END_SEG':
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
+                    iStatus = True
 
-                    elif pos3_12 == 'START_SEG' and pos4_12 == 'BEFORE_SEG':
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
-                        iStatus = True
+                elif pos3_12 == 'START_SEG' and pos4_12 == 'END_SEG':
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength
 
-                    elif pos3_12 == 'END_SEG' and pos4_12 == 'AFTER_SEG':
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i+1]])
-                        iStatus = True
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
 
-                    elif pos3_12 == 'AFTER_SEG' and pos4_12 == 'END_SEG':
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
-                        iStatus = True
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
-                    elif pos3_12 == 'START_SEG' and pos4_12 == 'END_SEG':
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
+                elif pos3_12 == 'END_SEG' and pos4_12 == 'START_SEG':
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
-                        iStatus = True
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength
 
-                    elif pos3_12 == 'END_SEG' and pos4_12 == 'START_SEG':
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
+                elif pos3_12 == 'BEFORE_SEG' and pos4_12 == 'INSIDE_SEG':
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
-                        iStatus = True
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
 
-                    elif pos3_12 == 'BEFORE_SEG' and pos4_12 == 'INSIDE_SEG':
+                    segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly2[j + 1]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
+                elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'BEFORE_SEG':
 
-                        segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly2[j + 1]])
-                        iStatus = True
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
 
-                    elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'BEFORE_SEG':
+                    segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength
 
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly2[j]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
+                elif pos3_12 == 'BEFORE_SEG' and pos4_12 == 'END_SEG':
 
-                        segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly2[j]])
-                        iStatus = True
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
 
-                    elif pos3_12 == 'BEFORE_SEG' and pos4_12 == 'END_SEG':
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
+                elif pos3_12 == 'END_SEG' and pos4_12 == 'BEFORE_SEG':
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
-                        iStatus = True
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
 
-                    elif pos3_12 == 'END_SEG' and pos4_12 == 'BEFORE_SEG':
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength
 
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
+                elif pos3_12 == 'START_SEG' and pos4_12 == 'INSIDE_SEG':
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
-                        iStatus = True
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
 
-                    elif pos3_12 == 'START_SEG' and pos4_12 == 'INSIDE_SEG':
+                    segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
-                        segONEInterAtParam = segONETotalLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly2[j + 1]])
+                    iStatus = True
+
+                elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'START_SEG':
+
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
+
+                    segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength
+
+                    # Store second pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly2[j]])
+                    iStatus = True
+
+                elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'INSIDE_SEG':
+
+                    if t3_12 < t4_12:
+
+                        segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
                         segTWOInterAtParam = segTWOTotalLength
 
                         # Store fisrt pair of intersection parameters
                         intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
+                            [segONEInterAtParam, segTWOInterAtParam, _poly2[j]])
 
                         segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
                         segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
@@ -1253,16 +1453,15 @@ class CompGeom:
                         # Store second pair of intersection parameters
                         intersecParams.append(
                             [segONEInterAtParam, segTWOInterAtParam, _poly2[j + 1]])
-                        iStatus = True
 
-                    elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'START_SEG':
+                    else:
 
-                        segONEInterAtParam = segONETotalLength
+                        segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
                         segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
                         # Store fisrt pair of intersection parameters
                         intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
+                            [segONEInterAtParam, segTWOInterAtParam, _poly2[j + 1]])
 
                         segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
                         segTWOInterAtParam = segTWOTotalLength
@@ -1270,208 +1469,170 @@ class CompGeom:
                         # Store second pair of intersection parameters
                         intersecParams.append(
                             [segONEInterAtParam, segTWOInterAtParam, _poly2[j]])
-                        iStatus = True
-
-                    elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'INSIDE_SEG':
-
-                        if t3_12 < t4_12:
-
-                            segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
-                            segTWOInterAtParam = segTWOTotalLength
-
-                            # Store fisrt pair of intersection parameters
-                            intersecParams.append(
-                                [segONEInterAtParam, segTWOInterAtParam, _poly2[j]])
-
-                            segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
-                            segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
-
-                            # Store second pair of intersection parameters
-                            intersecParams.append(
-                                [segONEInterAtParam, segTWOInterAtParam, _poly2[j + 1]])
 
-                        else:
-
-                            segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
-                            segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
-
-                            # Store fisrt pair of intersection parameters
-                            intersecParams.append(
-                                [segONEInterAtParam, segTWOInterAtParam, _poly2[j + 1]])
-
-                            segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
-                            segTWOInterAtParam = segTWOTotalLength
-
-                            # Store second pair of intersection parameters
-                            intersecParams.append(
-                                [segONEInterAtParam, segTWOInterAtParam, _poly2[j]])
-
-                        iStatus = True
-
-                    elif pos3_12 == 'BEFORE_SEG' and pos4_12 == 'AFTER_SEG':
+                    iStatus = True
 
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
+                elif pos3_12 == 'BEFORE_SEG' and pos4_12 == 'AFTER_SEG':
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
-
-                        # Store second pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
-                        iStatus = True
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
 
-                    elif pos3_12 == 'AFTER_SEG' and pos4_12 == 'BEFORE_SEG':
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
 
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
+                elif pos3_12 == 'AFTER_SEG' and pos4_12 == 'BEFORE_SEG':
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + t1_34*segTWOPartialLength
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
-                        iStatus = True
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
 
-                    elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'END_SEG':
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
 
-                        segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly2[j]])
+                elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'END_SEG':
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+                    segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
-                        iStatus = True
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly2[j]])
 
-                    elif pos3_12 == 'END_SEG' and pos4_12 == 'INSIDE_SEG':
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
-                        segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly2[j + 1]])
+                elif pos3_12 == 'END_SEG' and pos4_12 == 'INSIDE_SEG':
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength
+                    segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
-                        iStatus = True
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly2[j + 1]])
 
-                    elif pos3_12 == 'START_SEG' and pos4_12 == 'AFTER_SEG':
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength
 
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength
+                    # Store second pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
+                    iStatus = True
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
+                elif pos3_12 == 'START_SEG' and pos4_12 == 'AFTER_SEG':
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
-                        iStatus = True
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
 
-                    elif pos3_12 == 'AFTER_SEG' and pos4_12 == 'START_SEG':
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
 
-                        segONEInterAtParam = segONETotalLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
-
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
+                    # Store second pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
+                    iStatus = True
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
+                elif pos3_12 == 'AFTER_SEG' and pos4_12 == 'START_SEG':
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
-                        iStatus = True
+                    segONEInterAtParam = segONETotalLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
-                    elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'AFTER_SEG':
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i]])
 
-                        segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly2[j]])
+                    # Store second pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
+                    iStatus = True
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
+                elif pos3_12 == 'INSIDE_SEG' and pos4_12 == 'AFTER_SEG':
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
-                        iStatus = True
+                    segONEInterAtParam = segONETotalLength + t3_12*segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength
 
-                    elif pos3_12 == 'AFTER_SEG' and pos4_12 == 'INSIDE_SEG':
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly2[j]])
 
-                        segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
 
-                        # Store fisrt pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly2[j + 1]])
+                    # Store second pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
+                    iStatus = True
 
-                        segONEInterAtParam = segONETotalLength + segONEPartialLength
-                        segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
+                elif pos3_12 == 'AFTER_SEG' and pos4_12 == 'INSIDE_SEG':
 
-                        # Store second pair of intersection parameters
-                        intersecParams.append(
-                            [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
-                        iStatus = True
+                    segONEInterAtParam = segONETotalLength + t4_12*segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + segTWOPartialLength
 
-                elif status == 'TOUCH':
+                    # Store fisrt pair of intersection parameters
+                    intersecParams.append(
+                        [segONEInterAtParam, segTWOInterAtParam, _poly2[j + 1]])
 
-                    # one segments touches the other, in the middle or extremity!
-                    # checks if the curves are not consecutive segments
-                    # checks if the polygons touch at the extremities
+                    segONEInterAtParam = segONETotalLength + segONEPartialLength
+                    segTWOInterAtParam = segTWOTotalLength + t2_34*segTWOPartialLength
 
-                    segONEInterAtParam = segONETotalLength + t12*segONEPartialLength
-                    segTWOInterAtParam = segTWOTotalLength + t34*segTWOPartialLength
+                    # Store second pair of intersection parameters
                     intersecParams.append(
-                        [segONEInterAtParam, segTWOInterAtParam, pi])
+                        [segONEInterAtParam, segTWOInterAtParam, _poly1[i + 1]])
                     iStatus = True
 
-                segTWOTotalLength += segTWOPartialLength
+            elif status == 'TOUCH':
 
-            segONETotalLength += segONEPartialLength
+                # one segments touches the other, in the middle or extremity!
+                # checks if the curves are not consecutive segments
+                # checks if the polygons touch at the extremities
 
-        # removes duplicate elements
-        unique_intersecParams = []
-        for item in intersecParams:
-            if item not in unique_intersecParams:
-                unique_intersecParams.append(item)
+                segONEInterAtParam = segONETotalLength + t12*segONEPartialLength
+                segTWOInterAtParam = segTWOTotalLength + t34*segTWOPartialLength
+                intersecParams.append(
+                    [segONEInterAtParam, segTWOInterAtParam, pi])
+                iStatus = True
 
-        # sorts the pairs of params by the _poly1 parametric order
-        unique_intersecParams.sort()
 
-        for it in unique_intersecParams:
-            param1.append(it[0]/segONETotalLength)
-            param2.append(it[1]/segTWOTotalLength)
+        # removes duplicate elements (hashing the parameters and coordinates)
+        # and sorts the pairs of params by the _poly1 parametric order
+        unique_intersecParams = {}
+        for item in intersecParams:
+            key = (item[0], item[1], item[2].getX(), item[2].getY())
+            if key not in unique_intersecParams:
+                unique_intersecParams[key] = item
+
+        for key in sorted(unique_intersecParams):
+            it = unique_intersecParams[key]
+            param1.append(it[0]/totalLength1)
+            param2.append(it[1]/totalLength2)
             pts.append(it[2])
 
         return iStatus, pts, param1, param2
@@ -1557,3 +1718,145 @@ class CompGeom:
             pts.append(_segment.getPoint(t))
 
         return pts
+
+    # ---------------------------------------------------------------------
+    # Batch predicates: the functions below evaluate some of the predicates
+    # above for arrays of coordinates at once. Points are given as (n,2)
+    # arrays and straight segments as (m,4) arrays with rows [x1, y1, x2, y2].
+    # Each function applies the same floating-point operations as the
+    # corresponding scalar predicate, so both give the same results.
+    # ---------------------------------------------------------------------
+
+    # Return the coordinates of a list of points as an (n,2) array.
+    @staticmethod
+    def getCoordsArray(_pts):
+        return np.array([[pt.getX(), pt.getY()] for pt in _pts], dtype=float)
+
+    # Return the pieces of a polyline given by an (n,2) array of coordinates
+    # as an (n-1,4) array of straight segments.
+    @staticmethod
+    def getPiecesArray(_coords):
+        return np.hstack((_coords[:-1], _coords[1:]))
+
+    # Return the oriented twice areas formed by arrays of point triples,
+    # using the same floating-point filter as orient2d. Only the entries whose
+    # sign is not certain are evaluated exactly.
+    @staticmethod
+    def orient2dArray(_pa, _pb, _pc):
+        pa, pb, pc = np.broadcast_arrays(np.asarray(_pa, dtype=float),
+                                         np.asarray(_pb, dtype=float),
+                                         np.asarray(_pc, dtype=float))
+        acx = pa[:, 0] - pc[:, 0]
+        bcx = pb[:, 0] - pc[:, 0]
+        acy = pa[:, 1] - pc[:, 1]
+        bcy = pb[:, 1] - pc[:, 1]
+        detleft = acx * bcy
+        detright = acy * bcx
+        det = detleft - detright
+
+        errbound = CompGeom.CCWERRBOUND * (np.abs(detleft) + np.abs(detright))
+        for i in np.nonzero(np.abs(det) <= errbound)[0]:
+            det[i] = CompGeom.orient2dExact(pa[i], pb[i], pc[i])
+
+        return det
+
+    # Return the signs (-1, 0 or 1) of the oriented twice areas formed by
+    # arrays of point triples, which are the exact signs of signArea2d.
+    @staticmethod
+    def signArea2dArray(_x1, _y1, _x2, _y2, _x3, _y3):
+        det = CompGeom.orient2dArray(np.column_stack((_x1, _y1)),
+                                     np.column_stack((_x2, _y2)),
+                                     np.column_stack((_x3, _y3)))
+        return np.sign(det)
+
+    # Return a boolean array flagging the pairs of segments of two (m,4)
+    # arrays (or one segment against many, by broadcasting) that may
+    # intersect. The flagged pairs are exactly those for which
+    # computeSegmentSegmentIntersection does not return 'DO_NOT_INTERSECT'
+    # on its bounding box and side tests, so only them need to be classified.
+    @staticmethod
+    def segmentsMayIntersect(_segs1, _segs2):
+        s1, s2 = np.broadcast_arrays(np.asarray(_segs1, dtype=float),
+                                     np.asarray(_segs2, dtype=float))
+        x1, y1, x2, y2 = s1[:, 0], s1[:, 1], s1[:, 2], s1[:, 3]
+        x3, y3, x4, y4 = s2[:, 0], s2[:, 1], s2[:, 2], s2[:, 3]
+
+        # bounding box tests
+        mask = ~((np.maximum(x1, x2) + CompGeom.ABSTOL < np.minimum(x3, x4)) |
+                 (np.maximum(x3, x4) < np.minimum(x1, x2) - CompGeom.ABSTOL))
+        mask &= ~((np.maximum(y1, y2) + CompGeom.ABSTOL < np.minimum(y3, y4)) |
+                  (np.maximum(y3, y4) < np.minimum(y1, y2) - CompGeom.ABSTOL))
+
+        # one segment on the same side of the other (collinear segments
+        # are always classified)
+        sign123 = CompGeom.signArea2dArray(x1, y1, x2, y2, x3, y3)
+        sign124 = CompGeom.signArea2dArray(x1, y1, x2, y2, x4, y4)
+        collinear = (sign123 == 0) & (sign124 == 0)
+        mask &= ~((sign123 == sign124) & (sign123 != 0))
+        sign341 = CompGeom.signArea2dArray(x3, y3, x4, y4, x1, y1)
+        sign342 = CompGeom.signArea2dArray(x3, y3, x4, y4, x2, y2)
+        mask &= collinear | ~((sign341 == sign342) & (sign341 != 0))
+
+        return mask
+
+    # Return the closest points on an (m,4) array of segments to a given
+    # point and their distances to it, as arrays (xOn, yOn, dist).
+    @staticmethod
+    def closestPointSegments(_x, _y, _segs):
+        x1 = _segs[:, 0]
+        y1 = _segs[:, 1]
+        vx = _segs[:, 2] - x1
+        vy = _segs[:, 3] - y1
+        L2 = vx*vx + vy*vy
+
+        t = np.zeros(len(_segs))
+        nonzero = L2 > 0.0
+        t[nonzero] = (vx[nonzero]*(_x - x1[nonzero]) +
+                      vy[nonzero]*(_y - y1[nonzero])) / L2[nonzero]
+        t = np.minimum(np.maximum(t, 0.0), 1.0)
+
+        xOn = x1 + t*vx
+        yOn = y1 + t*vy
+        dist = np.sqrt((xOn - _x)*(xOn - _x) + (yOn - _y)*(yOn - _y))
+        return xOn, yOn, dist
+
+    # Return the number of crossings of the horizontal ray that starts at
+    # the given points and goes to the right with an (m,4) array of segments,
+    # following the rules of isPointInPolygon. The points are given by arrays
+    # of coordinates (or scalars) and one count is returned for each point.
+    @staticmethod
+    def countRayCrossings(_x, _y, _segs):
+        x = np.asarray(_x, dtype=float).reshape(-1, 1)
+        y = np.asarray(_y, dtype=float).reshape(-1, 1)
+        x1 = _segs[:, 0]
+        y1 = _segs[:, 1]
+        x2 = _segs[:, 2]
+        y2 = _segs[:, 3]
+
+        # discard horizontal lines and lines above, below or to the left
+        valid = ((y1 != y2) & ~((y1 > y) & (y2 > y)) &
+                 ~((y1 < y) & (y2 < y)) & ~((x1 < x) & (x2 < x)))
+
+        # x coordinate of the intersection of the ray with each line
+        dx = x1 - x2
+        dy = np.where(y1 != y2, y1 - y2, 1.0)
+        xc = x1 + np.where(dx != 0, (y - y1)*dx / dy, 0.0)
+
+        atFirst = (y1 == y)
+        atSecond = ~atFirst & (y2 == y)
+        between = ~atFirst & ~atSecond
+        crossing = ((atFirst & (x1 > x) & (y2 > y)) |
+                    (atSecond & (x2 > x) & (y1 > y)) |
+                    (between & (((x1 > x) & (x2 > x)) | (xc > x))))
+
+        return np.count_nonzero(valid & crossing, axis=1)
+
+    # Return a boolean array stating whether each point of an (n,2) array
+    # is inside the polygon given by an (m,2) array of coordinates.
+    @staticmethod
+    def pointsInPolygon(_pts, _poly):
+        pts = np.asarray(_pts, dtype=float)
+        poly = np.asarray(_poly, dtype=float)
+        segs = np.hstack((poly, np.roll(poly, -1, axis=0)))
+        ni = CompGeom.countRayCrossings(pts[:, 0], pts[:, 1], segs)
+        return (ni % 2) > 0
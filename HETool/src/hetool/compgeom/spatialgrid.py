@@ -0,0 +1,158 @@
+import math
+
+
+class SpatialGrid:
+    # Uniform hashed grid of bounding boxes. Each stored item is registered
+    # in every cell its box overlaps, so that window queries only visit the
+    # cells covered by the window instead of every item of the model.
+
+    MIN_ITEMS = 64        # below this number of items queries are linear
+    MAX_ITEM_CELLS = 256  # items spanning more cells are kept apart
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.boxes = {}
+        self.cells = {}
+        self.large = set()
+        self.cellSize = None
+        self.rebuildCount = SpatialGrid.MIN_ITEMS
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __contains__(self, _item):
+        return _item in self.boxes
+
+    def getBox(self, _item):
+        return self.boxes[_item]
+
+    def insert(self, _item, _xmin, _xmax, _ymin, _ymax):
+        if _item in self.boxes:
+            self.remove(_item)
+
+        box = (_xmin, _xmax, _ymin, _ymax)
+        self.boxes[_item] = box
+
+        if self.cellSize is None or len(self.boxes) >= self.rebuildCount:
+            self.rebuild()
+        else:
+            self.addToCells(_item, box)
+
+    def remove(self, _item):
+        box = self.boxes.pop(_item, None)
+        if box is None:
+            return
+
+        if self.cellSize is None:
+            return
+
+        if _item in self.large:
+            self.large.discard(_item)
+            return
+
+        i0, i1, j0, j1 = self.cellRange(box[0], box[1], box[2], box[3])
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                cell = self.cells.get((i, j))
+                if cell is not None:
+                    cell.discard(_item)
+                    if len(cell) == 0:
+                        del self.cells[(i, j)]
+
+    # returns the items whose bounding boxes overlap the given window
+    def query(self, _xmin, _xmax, _ymin, _ymax):
+        items = []
+
+        if self.cellSize is None:
+            for item, box in self.boxes.items():
+                if not (_xmax < box[0] or box[1] < _xmin or
+                        _ymax < box[2] or box[3] < _ymin):
+                    items.append(item)
+            return items
+
+        visited = set()
+        i0, i1, j0, j1 = self.cellRange(_xmin, _xmax, _ymin, _ymax)
+
+        # when the window covers more cells than there are items, it is
+        # cheaper to test every box
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(self.boxes):
+            candidates = self.boxes.keys()
+        else:
+            candidates = []
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    cell = self.cells.get((i, j))
+                    if cell is not None:
+                        candidates.extend(cell)
+            candidates.extend(self.large)
+
+        for item in candidates:
+            if item in visited:
+                continue
+            visited.add(item)
+
+            box = self.boxes[item]
+            if not (_xmax < box[0] or box[1] < _xmin or
+                    _ymax < box[2] or box[3] < _ymin):
+                items.append(item)
+
+        return items
+
+    def cellRange(self, _xmin, _xmax, _ymin, _ymax):
+        i0 = math.floor(_xmin / self.cellSize)
+        i1 = math.floor(_xmax / self.cellSize)
+        j0 = math.floor(_ymin / self.cellSize)
+        j1 = math.floor(_ymax / self.cellSize)
+        return i0, i1, j0, j1
+
+    def addToCells(self, _item, _box):
+        i0, i1, j0, j1 = self.cellRange(_box[0], _box[1], _box[2], _box[3])
+
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > SpatialGrid.MAX_ITEM_CELLS:
+            self.large.add(_item)
+            return
+
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                cell = self.cells.get((i, j))
+                if cell is None:
+                    cell = set()
+                    self.cells[(i, j)] = cell
+                cell.add(_item)
+
+    # recomputes the cell size from the current items and redistributes them.
+    # The grid is rebuilt each time the number of items doubles.
+    def rebuild(self):
+        self.cells = {}
+        self.large = set()
+
+        if len(self.boxes) < SpatialGrid.MIN_ITEMS:
+            self.cellSize = None
+            self.rebuildCount = SpatialGrid.MIN_ITEMS
+            return
+
+        xmin = ymin = math.inf
+        xmax = ymax = -math.inf
+        size = 0.0
+        for box in self.boxes.values():
+            xmin = min(xmin, box[0])
+            xmax = max(xmax, box[1])
+            ymin = min(ymin, box[2])
+            ymax = max(ymax, box[3])
+            size += max(box[1] - box[0], box[3] - box[2])
+
+        # cell size: about one item per cell, but not smaller than the
+        # average item size
+        n = len(self.boxes)
+        area = (xmax - xmin) * (ymax - ymin)
+        cellSize = max(math.sqrt(area / n), size / n)
+        if cellSize <= 0.0:
+            cellSize = max(xmax - xmin, ymax - ymin, 1.0)
+
+        self.cellSize = cellSize
+        self.rebuildCount = 2 * n
+
+        for item, box in self.boxes.items():
+            self.addToCells(item, box)
@@ -1,70 +1,332 @@
 from hetool.compgeom.compgeom import CompGeom
+from hetool.compgeom.spatialgrid import SpatialGrid
 from hetool.geometry.point import Point
 
 
 class Tesselation:
+
+    # Triangulates a simple polygon, optionally with holes, by ear clipping.
+    # The outer polygon and the holes may have any orientation. Each hole is
+    # first connected to the outer polygon by a bridge (a pair of coincident
+    # edges), so that a single polygon is clipped. Only reflex vertices can
+    # lie inside a candidate ear, so they are kept in a spatial grid and the
+    # ear test only visits the reflex vertices close to the ear.
+    # Returns a list of triangles, each one given by the indices of its
+    # points in the list formed by _p followed by the points of the holes.
+    # Triangles are returned counterclockwise.
+    # Ref.:
+    # D. Eberly - Triangulation by Ear Clipping, Geometric Tools, 2002.
     @staticmethod
-    def triangleParing(_p):
-        triangs = []
-        pn = len(_p)
-        left = []  # left neighbor indices
-        right = []  # right neighbor indices
-        isPolyPt = []
+    def triangleParing(_p, _holes=None):
+        coords = [(pt.getX(), pt.getY()) for pt in _p]
+        rings = [list(range(0, len(_p)))]
+        if _holes is not None:
+            for hole in _holes:
+                first = len(coords)
+                coords.extend((pt.getX(), pt.getY()) for pt in hole)
+                rings.append(list(range(first, len(coords))))
+
+        # a doubly linked list of nodes stores the polygon being clipped;
+        # bridge vertices appear twice in this list
+        vert = []
+        left = []  # left neighbor nodes
+        right = []  # right neighbor nodes
+        outer = Tesselation.addRing(rings[0], coords, True,
+                                    vert, left, right)
+        if outer is None:
+            return []
+
+        holeNodes = []
+        for ring in rings[1:]:
+            node = Tesselation.addRing(ring, coords, False, vert, left, right)
+            if node is not None:
+                holeNodes.append(node)
+
+        if len(holeNodes) > 0:
+            outer = Tesselation.eliminateHoles(outer, holeNodes, coords,
+                                               vert, left, right)
+
+        return Tesselation.clipEars(outer, coords, vert, left, right)
+
+    # Appends a ring of point indices to the linked list of nodes, with
+    # the requested orientation (counterclockwise for the outer polygon,
+    # clockwise for holes). Consecutive coincident points are skipped.
+    # Returns the first node of the ring, or None for degenerate rings.
+    @staticmethod
+    def addRing(_ring, _coords, _ccw, _vert, _left, _right):
+        ring = []
+        for v in _ring:
+            if len(ring) == 0 or _coords[v] != _coords[ring[-1]]:
+                ring.append(v)
+        while len(ring) > 1 and _coords[ring[0]] == _coords[ring[-1]]:
+            ring.pop()
+        if len(ring) < 3:
+            return None
+
+        area = 0.0
+        for i in range(0, len(ring)):
+            a = _coords[ring[i-1]]
+            b = _coords[ring[i]]
+            area += a[0]*b[1] - a[1]*b[0]
+        if (area > 0.0) != _ccw:
+            ring.reverse()
+
+        first = len(_vert)
+        n = len(ring)
+        for i in range(0, n):
+            _vert.append(ring[i])
+            _left.append(first + (i - 1) % n)
+            _right.append(first + (i + 1) % n)
+
+        return first
+
+    # Connects each hole to the outer polygon. Holes are processed from
+    # the rightmost to the leftmost, and each one is connected through its
+    # rightmost vertex to a visible vertex of the current polygon.
+    @staticmethod
+    def eliminateHoles(_outer, _holeNodes, _coords, _vert, _left, _right):
+        holes = []
+        for node in _holeNodes:
+            rightmost = node
+            curr = _right[node]
+            while curr != node:
+                if _coords[_vert[curr]] > _coords[_vert[rightmost]]:
+                    rightmost = curr
+                curr = _right[curr]
+            holes.append(rightmost)
+        holes.sort(key=lambda node: _coords[_vert[node]], reverse=True)
+
+        for hole in holes:
+            bridge = Tesselation.findHoleBridge(hole, _outer, _coords,
+                                                _vert, _left, _right)
+            if bridge is None:
+                continue
+
+            # duplicates the bridge and hole vertices and links them:
+            # ... bridge -> hole -> ... -> hole' -> bridge' -> ...
+            bridge2 = len(_vert)
+            _vert.append(_vert[bridge])
+            hole2 = len(_vert)
+            _vert.append(_vert[hole])
+            _left.extend([None, None])
+            _right.extend([None, None])
+
+            bridgeNext = _right[bridge]
+            holePrev = _left[hole]
+
+            _right[bridge] = hole
+            _left[hole] = bridge
+
+            _right[holePrev] = hole2
+            _left[hole2] = holePrev
+            _right[hole2] = bridge2
+            _left[bridge2] = hole2
+            _right[bridge2] = bridgeNext
+            _left[bridgeNext] = bridge2
+
+        return _outer
+
+    # Finds a vertex of the polygon visible from the given hole vertex.
+    # A ray is cast from the hole vertex in the positive x direction and
+    # the closest crossed edge is found. Its endpoint with the largest x is
+    # the candidate, unless a reflex vertex lies inside the triangle formed
+    # by the hole vertex, the intersection point and the candidate, in which
+    # case the vertex of smallest angle with the ray is taken.
+    @staticmethod
+    def findHoleBridge(_hole, _outer, _coords, _vert, _left, _right):
+        hx, hy = _coords[_vert[_hole]]
+        qx = None
+        m = None
+
+        node = _outer
+        while True:
+            a = _coords[_vert[node]]
+            b = _coords[_vert[_right[node]]]
+            # in a counterclockwise polygon the edges to the right of an
+            # interior point go upwards
+            if a[1] <= hy <= b[1] and a[1] != b[1]:
+                x = a[0] + (hy - a[1]) * (b[0] - a[0]) / (b[1] - a[1])
+                if x >= hx and (qx is None or x < qx):
+                    qx = x
+                    m = node if a[0] > b[0] else _right[node]
+                    if x == hx:
+                        return m
+            node = _right[node]
+            if node == _outer:
+                break
+
+        if m is None:
+            return None
+
+        mx, my = _coords[_vert[m]]
+        if hy < my:
+            tri = [(hx, hy), (qx, hy), (mx, my)]
+        else:
+            tri = [(qx, hy), (hx, hy), (mx, my)]
+        tanMin = None
+        stop = m
+        node = m
+        while True:
+            p = _coords[_vert[node]]
+            if (hx < p[0] <= mx and
+                    Tesselation.isPointInTriangle(p, tri) and
+                    Tesselation.isLocallyInside(node, (hx, hy), _coords,
+                                                _vert, _left, _right)):
+                tan = abs(hy - p[1]) / (p[0] - hx)
+                if (tanMin is None or tan < tanMin or
+                        (tan == tanMin and p[0] < _coords[_vert[m]][0])):
+                    m = node
+                    tanMin = tan
+            node = _right[node]
+            if node == stop:
+                break
+
+        return m
 
-        for i in range(0, pn):
-            # initialization
-            left.append(((i-1) + pn) % pn)
-            right.append(((i+1) + pn) % pn)
-            isPolyPt.append(True)
+    # Checks whether the segment from a node to the given point starts
+    # inside the polygon, that is, inside the angle of the node.
+    @staticmethod
+    def isLocallyInside(_node, _pt, _coords, _vert, _left, _right):
+        a = _coords[_vert[_left[_node]]]
+        b = _coords[_vert[_node]]
+        c = _coords[_vert[_right[_node]]]
+        if CompGeom.orient2d(a, b, c) > 0.0:
+            return (CompGeom.orient2d(a, b, _pt) >= 0.0 and
+                    CompGeom.orient2d(b, c, _pt) >= 0.0)
+        return (CompGeom.orient2d(a, b, _pt) >= 0.0 or
+                CompGeom.orient2d(b, c, _pt) >= 0.0)
 
-        i = pn-1  # counter
+    # Clips the ears of a counterclockwise polygon given by a linked list
+    # of nodes. When a whole turn around the polygon finds no ear, which
+    # only happens for degenerate or self-intersecting polygons, a
+    # collinear vertex is dropped or, if there is none, the most convex
+    # vertex is clipped anyway, so the process always ends.
+    @staticmethod
+    def clipEars(_start, _coords, _vert, _left, _right):
+        triangs = []
 
-        while len(triangs) < (pn-2):
+        # reflex (and collinear) vertices are the only ones that may
+        # invalidate an ear
+        reflex = SpatialGrid()
+        size = 0
+        node = _start
+        while True:
+            size += 1
+            if not Tesselation.isConvex(node, _coords, _vert, _left, _right):
+                x, y = _coords[_vert[node]]
+                reflex.insert(node, x, x, y, y)
+            node = _right[node]
+            if node == _start:
+                break
 
-            i = right[i]
-            if (Tesselation.ear_Q(left[i], i, right[i], _p, isPolyPt)):
-                # Original implementation (SKIENA & REVILLA, 2002):
-                # add_triangle(t,l[i],i,r[i],p);
-                tri = [None, None, None]
+        node = _start
+        fails = 0
+        while size > 3:
+            prev = _left[node]
+            next = _right[node]
 
-                tri[0] = left[i]
-                tri[1] = i
-                tri[2] = right[i]
-                triangs.append(tri)
-                isPolyPt[i] = False
+            if Tesselation.isEar(node, _coords, _vert, _left, _right, reflex):
+                triangs.append([_vert[prev], _vert[node], _vert[next]])
+            elif fails >= size:
+                node = Tesselation.findForcedEar(node, _coords, _vert,
+                                                 _left, _right)
+                prev = _left[node]
+                next = _right[node]
+                if Tesselation.isConvex(node, _coords, _vert, _left, _right):
+                    triangs.append([_vert[prev], _vert[node], _vert[next]])
+            else:
+                node = next
+                fails += 1
+                continue
 
-                # update left and right neighbor lists
-                left[right[i]] = left[i]
-                right[left[i]] = right[i]
+            # removes the clipped vertex and updates its neighbors, which
+            # may become convex (or reflex, for degenerate polygons)
+            reflex.remove(node)
+            _right[prev] = next
+            _left[next] = prev
+            size -= 1
+            fails = 0
+            for neighbor in (prev, next):
+                if Tesselation.isConvex(neighbor, _coords, _vert,
+                                        _left, _right):
+                    reflex.remove(neighbor)
+                elif neighbor not in reflex:
+                    x, y = _coords[_vert[neighbor]]
+                    reflex.insert(neighbor, x, x, y, y)
+            node = _right[next]
 
-        del right
-        del left
-        del isPolyPt
+        if Tesselation.isConvex(node, _coords, _vert, _left, _right):
+            triangs.append([_vert[_left[node]], _vert[node],
+                            _vert[_right[node]]])
 
         return triangs
 
-    # Original implementation (SKIENA & REVILLA, 2002)
-    # creates a ear for the hull
+    # Checks whether the vertex of a node is strictly convex
+    @staticmethod
+    def isConvex(_node, _coords, _vert, _left, _right):
+        return CompGeom.orient2d(_coords[_vert[_left[_node]]],
+                                 _coords[_vert[_node]],
+                                 _coords[_vert[_right[_node]]]) > 0.0
+
+    # Checks whether a node is an ear: it must be convex and no reflex
+    # vertex may lie inside (or on the border of) its triangle. Vertices
+    # coincident with the triangle vertices are ignored, as bridge
+    # vertices appear twice in the polygon.
     @staticmethod
-    def ear_Q(_i,  _j,  _k,  _p, _isPolyPt):
-        t = [None, None, None]  # coordinates for points i,j,k
-        t[0] = _p[_i]
-        t[1] = _p[_j]
-        t[2] = _p[_k]
-
-        # Check for angle ijk (centered in j) greater then 180 degrees
-        if Tesselation.cw(t[0], t[1], t[2]):
+    def isEar(_node, _coords, _vert, _left, _right, _reflex):
+        if _node in _reflex or not Tesselation.isConvex(_node, _coords,
+                                                         _vert, _left, _right):
             return False
 
-        for m in range(0, len(_p)):
-            if _isPolyPt[m]:
-                if _p[m] != t[0] and _p[m] != t[1] and _p[m] != t[2]:
-                    if Tesselation.point_in_triangle(_p[m], t):
-                        return False
+        tri = [_coords[_vert[_left[_node]]],
+               _coords[_vert[_node]],
+               _coords[_vert[_right[_node]]]]
+        xmin = min(tri[0][0], tri[1][0], tri[2][0])
+        xmax = max(tri[0][0], tri[1][0], tri[2][0])
+        ymin = min(tri[0][1], tri[1][1], tri[2][1])
+        ymax = max(tri[0][1], tri[1][1], tri[2][1])
 
+        for m in _reflex.query(xmin, xmax, ymin, ymax):
+            p = _coords[_vert[m]]
+            if p != tri[0] and p != tri[1] and p != tri[2]:
+                if Tesselation.isPointInTriangle(p, tri):
+                    return False
+
+        return True
+
+    # Chooses the node to be clipped when no ear is found: a vertex
+    # collinear with its neighbors if there is one, otherwise the most
+    # convex vertex of the polygon
+    @staticmethod
+    def findForcedEar(_start, _coords, _vert, _left, _right):
+        best = _start
+        bestDet = None
+        node = _start
+        while True:
+            det = CompGeom.orient2d(_coords[_vert[_left[node]]],
+                                    _coords[_vert[node]],
+                                    _coords[_vert[_right[node]]])
+            if det == 0.0:
+                return node
+            if bestDet is None or det > bestDet:
+                best = node
+                bestDet = det
+            node = _right[node]
+            if node == _start:
+                break
+
+        return best
+
+    # verifies if the point (x, y) _p is inside or on the border of the
+    # counterclockwise triangle _t
+    @staticmethod
+    def isPointInTriangle(_p, _t):
+        for i in range(0, 3):
+            if CompGeom.orient2d(_t[i], _t[(i+1) % 3], _p) < 0.0:
+                return False
         return True
 
-    # verifies if the order of the triangle connectivity
+    # verifies the order of the triangle connectivity
     @staticmethod
     def cw(_a,  _b, _c):
         return not (CompGeom.isLeftSide(_a, _b, _c))
@@ -86,18 +348,23 @@ class Tesselation:
         return True
 
     @staticmethod
-    def tessellate(_pts):
-        indices = Tesselation.triangleParing(_pts)
+    def tessellate(_pts, _holes=None):
+        pts = list(_pts)
+        if _holes is not None:
+            for hole in _holes:
+                pts.extend(hole)
+
+        indices = Tesselation.triangleParing(_pts, _holes)
         triangs = []
 
         for j in range(0, len(indices)):
             triangle = []
-            triangle.append(Point(_pts[indices[j][0]].getX(),
-                                  _pts[indices[j][0]].getY()))
-            triangle.append(Point(_pts[indices[j][1]].getX(),
-                                  _pts[indices[j][1]].getY()))
-            triangle.append(Point(_pts[indices[j][2]].getX(),
-                                  _pts[indices[j][2]].getY()))
+            triangle.append(Point(pts[indices[j][0]].getX(),
+                                  pts[indices[j][0]].getY()))
+            triangle.append(Point(pts[indices[j][1]].getX(),
+                                  pts[indices[j][1]].getY()))
+            triangle.append(Point(pts[indices[j][2]].getX(),
+                                  pts[indices[j][2]].getY()))
             triangs.append(triangle)
 
         return triangs
@@ -1,7 +1,7 @@
 from hetool.geometry.point import Point
 from hetool.compgeom.tesselation import Tesselation
-from hetool.compgeom.compgeom import CompGeom
 import math
+import numpy as np
 
 
 class Patch:
@@ -11,6 +11,7 @@ class Patch:
         self.segments = _segments if _segments is not None else []
         self.segmentOrients = _segmentOrients if _segmentOrients is not None else []
         self.mesh = None
+        self.meshRevision = 0  # increased whenever the mesh is replaced
         self.selected = False
         self.holes = []
         self.holesOrients = []
@@ -18,6 +19,9 @@ class Patch:
         self.face = None
         self.triangles = []
         self.attributes = []
+        self.revision = 0  # geometry revision counter
+        self.tessellation = None
+        self.tessellationRevision = None
 
 
     def __del__(self):
@@ -27,9 +31,20 @@ class Patch:
     def setBoundary(self, segments, orients):
         self.segments = segments
         self.segmentOrients = orients
+        self.updateRevision()
 
     def addHole(self, hole_pts):
         self.holes.append(hole_pts)
+        self.updateRevision()
+
+    # The revision counter is increased whenever the geometry of the patch
+    # may have changed (by the HE operators or by a new boundary), so that
+    # data derived from the geometry can be cached and validated against it.
+    def updateRevision(self):
+        self.revision += 1
+
+    def getRevision(self):
+        return self.revision
 
     def setTriangles(self, triangles):
         self.triangles = triangles
@@ -54,10 +69,19 @@ class Patch:
 
     def setMesh(self, _pts, _conn):
         self.mesh = (_pts, _conn)
+        self.meshRevision += 1
 
     def getMesh(self):
         return self.mesh
 
+    # replaces the mesh by a (points, connectivity) pair or by None
+    def replaceMesh(self, _mesh):
+        self.mesh = _mesh
+        self.meshRevision += 1
+
+    def getMeshRevision(self):
+        return self.meshRevision
+
     def getBoundBox(self):
 
         if len(self.pts) == 0:
@@ -83,6 +107,7 @@ class Patch:
     def setHoles(self, _holessegments, _isOriented):
         self.holes = _holessegments
         self.holesOrients = _isOriented
+        self.updateRevision()
 
     def setInternalSegments(self, _internalSegments, _isOriented):
         self.internalSegments = _internalSegments
@@ -157,33 +182,39 @@ class Patch:
 
         return polygons
 
+    # Returns the points of the patch region (boundary followed by holes)
+    # and its triangles, given by the indices of their points.
+    # The triangulation is computed once, with the holes, and is kept
+    # while the revision of the patch does not change.
+    def getTessellation(self):
+        if self.tessellationRevision != self.revision:
+            if len(self.segments) > 0:
+                pts = self.boundaryPolygon()
+                holes = self.boundaryHole()
+            else:
+                pts = list(self.pts)
+                holes = []
+
+            triangs = Tesselation.triangleParing(pts, holes)
+            for hole in holes:
+                pts.extend(hole)
+            self.tessellation = (pts, triangs)
+            self.tessellationRevision = self.revision
+
+        return self.tessellation
+
     def Area(self):
         Area = 0
-        pts = self.pts
-        triangs = Tesselation.triangleParing(pts)
+        pts, triangs = self.getTessellation()
         for j in range(0, len(triangs)):
-            a = Point(pts[triangs[j][0]].getX(),
-                      pts[triangs[j][0]].getY())
-            b = Point(pts[triangs[j][1]].getX(),
-                      pts[triangs[j][1]].getY())
-            c = Point(pts[triangs[j][2]].getX(),
-                      pts[triangs[j][2]].getY())
+            a = pts[triangs[j][0]]
+            b = pts[triangs[j][1]]
+            c = pts[triangs[j][2]]
 
             Area += (a.getX()*b.getY() - a.getY()*b.getX()
                      + a.getY()*c.getX() - a.getX()*c.getY()
                      + b.getX()*c.getY() - c.getX()*b.getY()) / 2.0
 
-        internalFaces = self.face.internalFaces()
-        if len(internalFaces) > 0:
-            for face in internalFaces:
-                Area -= face.patch.Area()
-                adjacentFaces = face.adjacentFaces()
-                for adjface in adjacentFaces:
-                    if adjface not in internalFaces and adjface != self.face:
-                        pts = adjface.patch.getPoints()
-                        if CompGeom.isPointInPolygon(self.pts, pts[0]):
-                            Area -= adjface.patch.Area()
-
         return Area
 
 # ---------------------- MUDANÇAS LUCAS ------------------------------------
@@ -243,9 +274,9 @@ class Patch:
                             n = att['properties']['Value']
                             break
                 
-                for i in range(n):
-                    t = i / float(n)
-                    collected.append(seg.getPoint(t))
+                ts = np.arange(n) / float(n)
+                for x, y in seg.getPointsAt(ts).tolist():
+                    collected.append(Point(x, y))
             return collected
 
         pts.extend(collect_points(self.segments))
@@ -2,6 +2,7 @@ from hetool.geometry.point import Point
 from hetool.geometry.segments.segment import Segment
 from hetool.compgeom.compgeom import CompGeom
 import math
+import numpy as np
 
 
 class Line(Segment):
@@ -44,6 +45,14 @@ class Line(Segment):
             yOn = self.pt1.getY() + _t * vy
         return Point(xOn, yOn)
 
+    # evaluates the line at an array of parametric values and returns
+    # the coordinates as an (n,2) array
+    def getPointsAt(self, _ts):
+        ts = np.clip(np.asarray(_ts, dtype=float), 0.0, 1.0)
+        p1 = np.array([self.pt1.getX(), self.pt1.getY()])
+        v = np.array([self.pt2.getX(), self.pt2.getY()]) - p1
+        return p1 + ts[:, None] * v
+
     def isPossible(self):
         if self.nPts < 2:
             return False
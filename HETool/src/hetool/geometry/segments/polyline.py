@@ -3,6 +3,8 @@ from hetool.geometry.segments.segment import Segment
 from hetool.geometry.segments.line import Line
 from hetool.compgeom.compgeom import CompGeom
 import math
+import bisect
+import numpy as np
 
 
 class Polyline(Segment):
@@ -13,10 +15,14 @@ class Polyline(Segment):
         self.nPts = 0
         self.edge = None
         self.attributes = []
+        self.arcLengths = None
+        self.pieces = None
 
     def addPoint(self, _x, _y):
         self.pts.append(Point(_x, _y))
         self.nPts += 1
+        self.arcLengths = None
+        self.pieces = None
 
     def getNumberOfPoints(self):
         return self.nPts
@@ -29,30 +35,16 @@ class Polyline(Segment):
         if _t >= 1.0:
             return Point(self.pts[-1].getX(), self.pts[-1].getY())
 
-        length = self.length(0, 1)
-        s = _t*length
+        lengths = self.getArcLengths()
+        s = _t*lengths[-1]
+        next_id = self.findPiece(s)
+        prev_id = next_id - 1
         loc_t = 1.0
-        prev_id = 0
-        next_id = 0
-        length = 0
 
-        for i in range(1, len(self.pts)):
-            prev_id = i - 1
-            next_id = i
-            dist = math.sqrt((self.pts[i].getX() - self.pts[i - 1].getX()) *
-                             (self.pts[i].getX() - self.pts[i - 1].getX()) +
-                             (self.pts[i].getY() - self.pts[i - 1].getY()) *
-                             (self.pts[i].getY() - self.pts[i - 1].getY()))
-            
-            #ALTERAÇÃO LUCAS
-            if dist < 1e-12:
-                continue
-
-            if (length + dist) >= s:
-                loc_t = (s - length) / dist
-                break
-
-            length += dist
+        #ALTERAÇÃO LUCAS
+        dist = lengths[next_id] - lengths[prev_id]
+        if dist >= 1e-12:
+            loc_t = (s - lengths[prev_id]) / dist
 
         x = self.pts[prev_id].getX() + loc_t * \
             (self.pts[next_id].getX() - self.pts[prev_id].getX())
@@ -61,6 +53,28 @@ class Polyline(Segment):
 
         return Point(x, y)
 
+    # evaluates the polyline at an array of parametric values and returns
+    # the coordinates as an (n,2) array
+    def getPointsAt(self, _ts):
+        ts = np.asarray(_ts, dtype=float)
+        pts = np.array([[p.getX(), p.getY()] for p in self.pts])
+        lengths = np.array(self.getArcLengths())
+
+        s = ts*lengths[-1]
+        next_id = np.searchsorted(lengths, s, side='left')
+        next_id = np.clip(next_id, 1, len(lengths) - 1)
+        prev_id = next_id - 1
+
+        dist = lengths[next_id] - lengths[prev_id]
+        loc_t = np.ones(len(ts))
+        valid = dist >= 1e-12
+        loc_t[valid] = (s[valid] - lengths[prev_id[valid]]) / dist[valid]
+
+        coords = pts[prev_id] + loc_t[:, None] * (pts[next_id] - pts[prev_id])
+        coords[ts <= 0.0] = pts[0]
+        coords[ts >= 1.0] = pts[-1]
+        return coords
+
     def isPossible(self):
         if self.nPts < 2:
             return False
@@ -83,22 +97,77 @@ class Polyline(Segment):
 
     def setInitPoint(self, _pt):
         self.pts[0] = _pt
+        self.arcLengths = None
+        self.pieces = None
 
     def setEndPoint(self, _pt):
         self.pts[-1] = _pt
+        self.arcLengths = None
+        self.pieces = None
+
+    # returns the cumulative arc-length at each point of the polyline. The list
+    # is built on demand and discarded whenever the points are changed
+    def getArcLengths(self):
+        if self.arcLengths is None:
+            lengths = [0.0]
+            L = 0.0
+            for i in range(1, len(self.pts)):
+                dx = self.pts[i].getX() - self.pts[i-1].getX()
+                dy = self.pts[i].getY() - self.pts[i-1].getY()
+                L += math.sqrt(dx*dx + dy*dy)
+                lengths.append(L)
+
+            self.arcLengths = lengths
+
+        return self.arcLengths
+
+    # returns the pieces of the polyline as an (n-1,4) array of segments, used
+    # by the batch predicates of CompGeom. Like the arc-lengths, the array is
+    # built on demand and discarded whenever the points are changed
+    def getPieces(self):
+        if self.pieces is None:
+            self.pieces = CompGeom.getPiecesArray(
+                CompGeom.getCoordsArray(self.pts))
+
+        return self.pieces
+
+    # returns the index of the end point of the piece of the polyline that
+    # contains the given arc-length (binary search on the arc-length list)
+    def findPiece(self, _s):
+        lengths = self.getArcLengths()
+        i = bisect.bisect_left(lengths, _s)
+        return min(max(i, 1), len(lengths) - 1)
 
     def closestPoint(self, _x, _y):
+        xOn = self.pts[0].getX()
+        yOn = self.pts[0].getY()
+        dmin = math.sqrt((xOn - _x)*(xOn - _x) + (yOn - _y)*(yOn - _y))
+
+        # long polylines are projected on all of their pieces at once
+        if len(self.pts) > CompGeom.BATCH_MIN:
+            x, y, d = CompGeom.closestPointSegments(_x, _y, self.getPieces())
+            i = np.argmin(d)
+            if d[i] < dmin:
+                return float(x[i]), float(y[i]), float(d[i])
+            return xOn, yOn, dmin
+
+        # project the point on each piece of the polyline
+        for i in range(1, len(self.pts)):
+            x1 = self.pts[i - 1].getX()
+            y1 = self.pts[i - 1].getY()
+            vx = self.pts[i].getX() - x1
+            vy = self.pts[i].getY() - y1
+            L2 = vx*vx + vy*vy
+
+            if L2 > 0.0:
+                t = (vx*(_x - x1) + vy*(_y - y1)) / L2
+                t = min(max(t, 0.0), 1.0)
+            else:
+                t = 0.0
 
-        aux = Line(self.pts[0], self.pts[1])
-        x, y, d = aux.closestPoint(_x, _y)
-        xOn = x
-        yOn = y
-
-        dmin = d
-
-        for i in range(2, len(self.pts)):
-            aux = Line(self.pts[i - 1], self.pts[i])
-            x, y, d = aux.closestPoint(_x, _y)
+            x = x1 + t*vx
+            y = y1 + t*vy
+            d = math.sqrt((x - _x)*(x - _x) + (y - _y)*(y - _y))
 
             if d < dmin:
                 xOn = x
@@ -164,31 +233,9 @@ class Polyline(Segment):
             tan = Point.normalize(tan)
             return tan
 
-        length = 0.0
-
-        for j in range(1, len(self.pts)):
-            length += math.sqrt((self.pts[j].getX()-self.pts[j-1].getX())
-                                * (self.pts[j].getX()-self.pts[j-1].getX()) +
-                                (self.pts[j].getY()-self.pts[j-1].getY()) *
-                                (self.pts[j].getY()-self.pts[j-1].getY()))
-
-        s = _t*length
-        prev_id = 0
-        next_id = 0
-
-        for i in range(1, len(self.pts)):
-            prev_id = i - 1
-            next_id = i
-
-            d = math.sqrt((self.pts[i].getX()-self.pts[i-1].getX())
-                          * (self.pts[i].getX()-self.pts[i-1].getX()) +
-                          (self.pts[i].getY()-self.pts[i-1].getY()) *
-                          (self.pts[i].getY()-self.pts[i-1].getY()))
-
-            if length + d >= s:
-                break
-
-            length += d
+        s = _t*self.getArcLengths()[-1]
+        next_id = self.findPiece(s)
+        prev_id = next_id - 1
 
         tan = self.pts[next_id] - self.pts[prev_id]
         tan = Point.normalize(tan)
@@ -200,16 +247,11 @@ class Polyline(Segment):
         return flag, pts, params
 
     def clone(self):
-        myClone = Polyline(self.pts)
+        myClone = Polyline(list(self.pts))
         return myClone
 
     def length(self, _t0, _t1):
-        L = 0.0
-        pts = self.getPoints()
-        for i in range(1, len(pts)):
-            L += math.sqrt((pts[i].getX()-pts[i-1].getX())*(pts[i].getX()-pts[i-1].getX()) + (
-                pts[i].getY()-pts[i-1].getY()) * (pts[i].getY()-pts[i-1].getY()))
-
+        L = self.getArcLengths()[-1]
         return L*(_t1-_t0)
 
     def splitSegment(self, _t, _pt):
@@ -223,23 +265,15 @@ class Polyline(Segment):
             _segment2 = None
             return _segment1, _segment2
 
-        L = self.length(0, 1)
-        s = _t*L
+        lengths = self.getArcLengths()
+        s = _t*lengths[-1]
+        next_id = self.findPiece(s)
+        prev_id = next_id - 1
         loc_t = 1.0
-        prev_id = 0
-        next_id = 0
-        L = 0.0
+        d = lengths[next_id] - lengths[prev_id]
+        if d > 0.0:
+            loc_t = (s-lengths[prev_id])/d
         pts = self.getPoints()
-        for j in range(1, len(pts)):
-            prev_id = j - 1
-            next_id = j
-            d = math.sqrt((pts[j].getX()-pts[j-1].getX())*(pts[j].getX()-pts[j-1].getX()) + (
-                pts[j].getY()-pts[j-1].getY()) * (pts[j].getY()-pts[j-1].getY()))
-
-            if (L+d) >= s:
-                loc_t = (s-L)/d
-                break
-            L += d
 
         segment1_pts = []
         segment2_pts = []
@@ -288,6 +322,10 @@ class Polyline(Segment):
         n = len(self.pts)
         ni = 0
 
+        # long polylines are tested against the ray all at once
+        if n > CompGeom.BATCH_MIN:
+            return int(CompGeom.countRayCrossings(x, y, self.getPieces())[0])
+
         for i in range(0, n-1):
             pt1 = self.pts[i]
             pt2 = self.pts[i+1]
@@ -380,8 +418,8 @@ class Polyline(Segment):
 
     def intersectPoint(self, _pt, _tol):
 
-        partialLength = 0
-        totalLength = self.length(0, 1)
+        lengths = self.getArcLengths()
+        totalLength = lengths[-1]
         interStatus = False
         param = None
 
@@ -393,19 +431,14 @@ class Polyline(Segment):
             p2 = Point(self.pts[i].getX(), self.pts[i].getY())
 
             dist, pi, t = CompGeom.getClosestPointSegment(p1, p2, _pt)
-            length = math.sqrt(((self.pts[i].getX() - self.pts[i-1].getX()) *
-                                (self.pts[i].getX() - self.pts[i-1].getX())) +
-                               ((self.pts[i].getY() - self.pts[i-1].getY()) *
-                                (self.pts[i].getY() - self.pts[i-1].getY())))
+            length = lengths[i] - lengths[i-1]
 
             # skip init intersections at each segment (no repeated intersections)
             if dist <= _tol and t*length > _tol:
-                param = ((partialLength + t*length) / totalLength)
+                param = ((lengths[i-1] + t*length) / totalLength)
                 interStatus = True
                 break
 
-            partialLength += length
-
         return interStatus, param, pi
 
     def intersectSegment(self, _segment):
@@ -325,10 +325,10 @@ class SetMesh:
         return 'SET_MESH'
 
     def execute(self):
-        self.patch.mesh = self.mesh
+        self.patch.replaceMesh(self.mesh)
 
     def unexecute(self):
-        self.patch.mesh = self.oldMesh
+        self.patch.replaceMesh(self.oldMesh)
 
 
 class DelMesh:
@@ -340,10 +340,10 @@ class DelMesh:
         return 'SET_MESH'
 
     def execute(self):
-        self.patch.mesh = None
+        self.patch.replaceMesh(None)
 
     def unexecute(self):
-        self.patch.mesh = self.oldMesh
+        self.patch.replaceMesh(self.oldMesh)
 
 
 class SetNumberOfSubdivisions:
@@ -7,6 +7,7 @@ from hetool.he.eulerOperators.MVSE_KVJE import MVSE, KVJE
 from hetool.he.auxoperations import *
 from hetool.geometry.point import Point
 from hetool.geometry.segments.polyline import Polyline
+from hetool.geometry.segments.segment import Segment
 from hetool.he.undoredo import UndoRedo
 from hetool.compgeom.compgeom import CompGeom
 from hetool.he.hefile import HeFile
@@ -14,6 +15,9 @@ from hetool.geometry.attributes.attribmanager import AttribManager
 from hetool.geometry.attributes.attribsymbols import AttribSymbols
 import math
 import copy
+import heapq
+from collections import deque
+import numpy as np
 
 from hetool.he.auxoperations import (
     Flip,
@@ -67,15 +71,13 @@ class HeController:
 
     def addPoint(self, _pt, _tol):
         # check whether there is already a point with the same coordinates
-        for point in self.hemodel.points:
-            tol = Point(_tol, _tol)
-            if Point.equal(_pt, point, tol):
-                # in this case there is already a vertex with the same coordinates
-                return
+        if len(self.hemodel.verticesNearPoint(_pt, _tol)) > 0:
+            # in this case there is already a vertex with the same coordinates
+            return
 
         # if there isn't one, check whether the point intersects an edge in model
         intersec = False
-        edges = self.hemodel.shell.edges
+        edges = self.hemodel.edgesNearPoint(_pt, _tol)
         for edge in edges:
             intersec, param, pi = edge.segment.intersectPoint(_pt, _tol)
 
@@ -124,6 +126,212 @@ class HeController:
         self.undoredo.end()
         self.update()
 
+    def insertSegments(self, _segments, _tol):
+        self.undoredo.begin()
+
+        try:
+            segments = []
+            for segment in _segments:
+                if type(segment) == list:
+                    pts = []
+                    coords = list(segment)
+                    while len(coords) > 0:
+                        pts.append(Point(coords.pop(0), coords.pop(0)))
+                    segment = Polyline(pts)
+
+                status, pts, params = segment.selfIntersect()
+                if status:
+                    for seg in segment.split(params, pts):
+                        if seg is not None:
+                            segments.append(seg)
+                else:
+                    segments.append(segment)
+
+            # split the incoming segments at their mutual intersections, so that
+            # each piece only touches the others at its end points
+            segments = self.splitIncomingSegments(segments, _tol)
+
+            # the first piece creates the shell of an empty model
+            if self.hemodel.isEmpty() and len(segments) > 0:
+                self.addSegment(segments.pop(0), _tol)
+                self.update()
+
+            # split the pieces and the existing edges at their intersections,
+            # then build the arrangement of the pieces with the Euler operators
+            pieces = self.splitModelAndSegments(segments, _tol)
+            self.update()
+            self.insertArrangement(pieces, _tol)
+
+        except Exception:
+            # the part of the batch that was already inserted is undone
+            if self.undoredo.isInserting and len(self.undoredo.temp) > 0:
+                self.undoredo.end()
+                self.undo()
+                self.undoredo.clearRedo()
+            raise
+
+        finally:
+            # the whole set of segments is recorded as a single command
+            if self.undoredo.isInserting:
+                self.undoredo.end()
+            self.update()
+
+    def splitModelAndSegments(self, _segments, _tol):
+        # intersect all the pieces with the model before inserting any of them,
+        # so that each existing edge is split only once
+        incoming_split_maps = []
+        edges_split_map = {}
+        for segment in _segments:
+            incoming_split_map, existent_edges_split_map = self.intersectModel(
+                segment, _tol)
+            incoming_split_maps.append(incoming_split_map)
+
+            for edge, split_map in existent_edges_split_map:
+                if edge not in edges_split_map:
+                    edges_split_map[edge] = []
+                edges_split_map[edge].extend(split_map)
+
+        # merge the split points found by different pieces on the same edge
+        tol = Point(_tol, _tol)
+        existent_edges_split_map = []
+        for edge, split_map in edges_split_map.items():
+            split_map.sort(key=lambda item: item[0])
+            uniqueList = []
+            for item in split_map:
+                if len(uniqueList) > 0 and abs(item[0]-uniqueList[-1][0]) <= _tol and \
+                        Point.equal(item[1], uniqueList[-1][1], tol):
+                    continue
+                uniqueList.append(item)
+
+            existent_edges_split_map.append([edge, uniqueList])
+
+        self.splitExistingEdges(existent_edges_split_map, _tol)
+
+        # split each piece at its intersections with the model
+        pieces = []
+        for segment, split_map in zip(_segments, incoming_split_maps):
+            split_params = [item[0] for item in split_map[1:-1]]
+            split_pts = [item[1] for item in split_map[1:-1]]
+            points = [item[1] for item in split_map]
+
+            for i, seg in enumerate(segment.split(split_params, split_pts)):
+                if seg is None:
+                    print('it was not possible to insert the segment')
+                    raise ValueError
+
+                pieces.append([seg, points[i], points[i+1]])
+
+        return pieces
+
+    def insertArrangement(self, _pieces, _tol):
+        # The pieces only touch each other and the model at their end points.
+        # The end points are merged into nodes, which are either vertices of
+        # the model or new points, and the pieces are inserted from the nodes
+        # that are already in the model, so that the Euler operators never
+        # need a point location. Only one node of each component that is not
+        # connected to the model is located, before any piece is inserted.
+        tol = Point(_tol, _tol)
+        node_points = []
+        node_ids = {}
+        cells = {}
+
+        def findNode(_pt):
+            vertices = self.hemodel.verticesNearPoint(_pt, _tol)
+            if len(vertices) > 0:
+                point = vertices[-1].point
+                if id(point) not in node_ids:
+                    node_ids[id(point)] = len(node_points)
+                    node_points.append(point)
+                return node_ids[id(point)]
+
+            # new points are merged through a grid with cells of the tolerance size
+            i = math.floor(_pt.getX() / _tol)
+            j = math.floor(_pt.getY() / _tol)
+            for di in (-1, 0, 1):
+                for dj in (-1, 0, 1):
+                    for node in cells.get((i + di, j + dj), []):
+                        if Point.equal(node_points[node], _pt, tol):
+                            return node
+
+            node = len(node_points)
+            node_points.append(_pt)
+            cells.setdefault((i, j), []).append(node)
+            return node
+
+        pieces = []
+        for seg, init_point, end_point in _pieces:
+            if seg.length(0, 1) <= _tol:
+                continue
+            pieces.append([seg, findNode(init_point), findNode(end_point)])
+
+        adjacency = [[] for i in range(0, len(node_points))]
+        for k, piece in enumerate(pieces):
+            adjacency[piece[1]].append(k)
+            if piece[2] != piece[1]:
+                adjacency[piece[2]].append(k)
+
+        # place the first node of each component that is not connected to
+        # the model, while the face boundaries are still up to date
+        placed = [node_points[node].vertex is not None
+                  for node in range(0, len(node_points))]
+        component = [None] * len(node_points)
+        roots = []
+        for start in range(0, len(node_points)):
+            if component[start] is not None:
+                continue
+            component[start] = start
+            members = [start]
+            queue = [start]
+            while len(queue) > 0:
+                node = queue.pop()
+                for k in adjacency[node]:
+                    for other in pieces[k][1:]:
+                        if component[other] is None:
+                            component[other] = start
+                            members.append(other)
+                            queue.append(other)
+
+            if not any(placed[node] for node in members):
+                roots.append(start)
+
+        for node in roots:
+            face_target = self.hemodel.whichFace(node_points[node])
+            self.makeVertexInsideFace(node_points[node], face_target)
+            placed[node] = True
+
+        # insert the pieces in breadth-first order from the placed nodes
+        inserted = [False] * len(pieces)
+        queue = deque(node for node in range(0, len(node_points)) if placed[node])
+        while len(queue) > 0:
+            node = queue.popleft()
+            for k in adjacency[node]:
+                if inserted[k]:
+                    continue
+                inserted[k] = True
+
+                seg, init_node, end_node = pieces[k]
+                init_point = node_points[init_node]
+                end_point = node_points[end_node]
+
+                # check if the piece already exists in the model
+                make_segment = True
+                if placed[init_node] and placed[end_node]:
+                    init_vertex = init_point.vertex
+                    end_vertex = end_point.vertex
+                    if init_vertex.he.edge is not None and end_vertex.he.edge is not None:
+                        for edge in self.edgesBetween(init_vertex, end_vertex):
+                            if seg.isEqual(edge.segment, _tol):
+                                make_segment = False
+                                break
+
+                if make_segment:
+                    self.makeEdge(seg, init_point, end_point)
+
+                for other in (init_node, end_node):
+                    if not placed[other]:
+                        placed[other] = True
+                        queue.append(other)
+
     def addSegment(self, _segment, _tol):
         segmentPts = _segment.getPoints()
         init_pt = segmentPts[0]
@@ -161,16 +369,20 @@ class HeController:
         if self.hemodel.isEmpty():
             return
 
-        faces = self.hemodel.shell.faces
-        for i in range(1, len(faces)):
-            faces[i].updateBoundary()
-            faces[i].updateHoles()
+        # only the faces touched by the operations since the last update
+        #  need to have their boundaries and holes refreshed
+        infinityFace = self.hemodel.infinityFace
+        for face in self.hemodel.getChangedFaces():
+            if face != infinityFace:
+                face.updateBoundary()
+                face.updateHoles()
+                self.hemodel.updateFaceBox(face)
 
         # update internal loops of infinite Face
-        loop = faces[0].loop.next
-        faces[0].intLoops.clear()
+        loop = infinityFace.loop.next
+        infinityFace.intLoops.clear()
         while loop is not None:
-            faces[0].intLoops.append(loop)
+            infinityFace.intLoops.append(loop)
             loop = loop.next
 
         self.isChanged = True
@@ -356,6 +568,7 @@ class HeController:
                     self.undoredo.insertOperation(insertFace)
 
                     mef.face.updateBoundary()
+                    self.hemodel.updateFaceBox(mef.face)
 
                     inner_loops = self.findInnerLoops(
                         existent_face, mef.face, existent_loop)
@@ -454,6 +667,7 @@ class HeController:
                 self.undoredo.insertOperation(insertFace)
 
                 mef.face.updateBoundary()
+                self.hemodel.updateFaceBox(mef.face)
 
                 inner_loops = self.findInnerLoops(
                     existent_face, mef.face, existent_loop)
@@ -801,6 +1015,7 @@ class HeController:
 
         # gets the incoming segment bounding box
         xmin, xmax, ymin, ymax = _segment.getBoundBox()
+        segment_pts = _segment.getPoints()
 
         # -------------------------VERTEX INTERSECTION-------------------------
         # OBS: only floating vertices
@@ -823,20 +1038,32 @@ class HeController:
                 _segment)
 
             if status:
+                # the intersections are computed with exact predicates, so
+                # the points that are closer than the tolerance to an end
+                # vertex of the edge are snapped to it here
+                init_pt = edge.he1.vertex.point
+                end_pt = edge.he2.vertex.point
                 for i in range(0, len(pts)):
-                    if abs(existent_params[i]) <= CompGeom.ABSTOL:
-                        point = edge.he1.vertex.point
-                    elif abs(existent_params[i]-1.0) <= CompGeom.ABSTOL:
-                        point = edge.he2.vertex.point
+                    if Point.euclidiandistance(pts[i], init_pt) <= _tol:
+                        point = init_pt
+                    elif Point.euclidiandistance(pts[i], end_pt) <= _tol:
+                        point = end_pt
                     else:
                         point = pts[i]
                         # insert at existent params map
                         existent_edge_split_map.append(
                             [existent_params[i], point])
 
+                    # the incoming segment is not split close to its end
+                    #  points, which are replaced by the intersection point
+                    param = incoming_params[i]
+                    if Point.euclidiandistance(point, segment_pts[0]) <= _tol:
+                        param = 0.0
+                    elif Point.euclidiandistance(point, segment_pts[-1]) <= _tol:
+                        param = 1.0
+
                     # insert in incoming params map
-                    incoming_edge_split_map.append(
-                        [incoming_params[i], point])
+                    incoming_edge_split_map.append([param, point])
 
                 if len(existent_edge_split_map) > 0:
 
@@ -860,17 +1087,23 @@ class HeController:
                     existent_edges_split_map.append(
                         [edge, existent_edge_split_map])
 
-        # removes duplicate elements
+        # removes duplicate elements: a vertex of the model is found through
+        # each of its edges, with parameters that differ by round-off, and
+        # the vertex point is kept when a new point coincides with it
+        incoming_edge_split_map.sort(key=lambda item: item[0])
+        tol = Point(_tol, _tol)
         uniqueList = []
         for item in incoming_edge_split_map:
-            if item not in uniqueList:
-                uniqueList.append(item)
+            if len(uniqueList) > 0 and abs(item[0]-uniqueList[-1][0]) <= _tol and \
+                    Point.equal(item[1], uniqueList[-1][1], tol):
+                if item[1].vertex is not None:
+                    uniqueList[-1] = item
+                continue
+            uniqueList.append(item)
 
         incoming_edge_split_map = uniqueList
-        incoming_edge_split_map.sort()
 
         # try to insert init and end points
-        segment_pts = _segment.getPoints()
         if len(incoming_edge_split_map) == 0:
             incoming_edge_split_map.append([0.0, segment_pts[0]])
             incoming_edge_split_map.append([1.0, segment_pts[-1]])
@@ -882,6 +1115,92 @@ class HeController:
 
         return incoming_edge_split_map, existent_edges_split_map
 
+    def splitIncomingSegments(self, _segments, _tol):
+        n = len(_segments)
+        boxes = []
+        split_maps = []
+        for segment in _segments:
+            boxes.append(segment.getBoundBox())
+            split_maps.append([])
+
+        # sweep a vertical line from left to right: each segment is only
+        # intersected with the active segments, whose bounding boxes are
+        # crossed by the sweep line
+        order = sorted(range(0, n), key=lambda i: boxes[i][0])
+        active = set()
+        heap = []
+        for i in order:
+            xmin, xmax, ymin, ymax = boxes[i]
+
+            # remove the segments that are completely at the left of the line
+            while len(heap) > 0 and heap[0][0] < xmin - _tol:
+                active.discard(heapq.heappop(heap)[1])
+
+            for j in active:
+                if boxes[j][2] > ymax + _tol or boxes[j][3] < ymin - _tol:
+                    continue
+
+                status, pts, params_j, params_i = _segments[j].intersectSegment(
+                    _segments[i])
+
+                if status:
+                    pts_j = _segments[j].getPoints()
+                    pts_i = _segments[i].getPoints()
+                    for k in range(0, len(pts)):
+                        # use the existing end points at the extremities,
+                        #  snapping the points closer than the tolerance
+                        if Point.euclidiandistance(pts[k], pts_j[0]) <= _tol:
+                            point = pts_j[0]
+                            params_j[k] = 0.0
+                        elif Point.euclidiandistance(pts[k], pts_j[-1]) <= _tol:
+                            point = pts_j[-1]
+                            params_j[k] = 1.0
+                        elif Point.euclidiandistance(pts[k], pts_i[0]) <= _tol:
+                            point = pts_i[0]
+                            params_i[k] = 0.0
+                        elif Point.euclidiandistance(pts[k], pts_i[-1]) <= _tol:
+                            point = pts_i[-1]
+                            params_i[k] = 1.0
+                        else:
+                            point = pts[k]
+
+                        split_maps[j].append([params_j[k], point])
+                        split_maps[i].append([params_i[k], point])
+
+            active.add(i)
+            heapq.heappush(heap, (xmax, i))
+
+        # split each segment at its interior intersection points
+        segments = []
+        tol = Point(_tol, _tol)
+        for i in range(0, n):
+            split_map = sorted(split_maps[i], key=lambda item: item[0])
+
+            split_params = []
+            split_pts = []
+            for item in split_map:
+                if item[0] <= Segment.PARAM_TOL or 1.0 - item[0] <= Segment.PARAM_TOL:
+                    continue
+
+                # removes duplicate elements
+                if len(split_pts) > 0:
+                    if abs(item[0]-split_params[-1]) <= CompGeom.ABSTOL or \
+                            Point.equal(item[1], split_pts[-1], tol):
+                        continue
+
+                split_params.append(item[0])
+                split_pts.append(item[1])
+
+            if len(split_params) == 0:
+                segments.append(_segments[i])
+                continue
+
+            for segment in _segments[i].split(split_params, split_pts):
+                if segment is not None:
+                    segments.append(segment)
+
+        return segments
+
     def splitExistingEdges(self, _edges_split_map,_tol):
 
         # split each intersected existent segment and insert its segments
@@ -1091,7 +1410,6 @@ class HeController:
         split_params = []
         split_pts = []
         points = []
-        tol = Point(_tol, _tol)
 
         for split_nodes in _incoming_segment_split_map:
             split_params.append(split_nodes[0])
@@ -1127,15 +1445,15 @@ class HeController:
             # init_point and end_point are already exists in the model
             init_vertex = None
             end_vertex = None
-            vertices = self.hemodel.shell.vertices
+            vertices = self.hemodel.verticesNearPoint(init_point, _tol)
             for vertex in vertices:
-                if Point.equal(vertex.point, init_point, tol):
-                    init_vertex = vertex
-                    init_point = init_vertex.point
+                init_vertex = vertex
+                init_point = init_vertex.point
 
-                if Point.equal(vertex.point, end_point, tol):
-                    end_vertex = vertex
-                    end_point = end_vertex.point
+            vertices = self.hemodel.verticesNearPoint(end_point, _tol)
+            for vertex in vertices:
+                end_vertex = vertex
+                end_point = end_vertex.point
 
             make_segment = True
             if seg.length(0, 1) <= _tol:
@@ -1268,59 +1586,51 @@ class HeController:
 
         # select point
         ispointSelected = False
-        id_target = -1
-        dmin = _tol
+        point_target = None
         points = self.hemodel.getPoints()
         if self.select_point:
-            for i in range(0, len(points)):
-                dist = Point.euclidiandistance(Point(_x, _y), points[i])
-                if dist < dmin:
-                    dmin = dist
-                    id_target = i
+            vertex, dist = self.hemodel.closestVertex(_x, _y, _tol)
 
             # Revert selection of picked point
-            if id_target > -1:
+            if vertex is not None:
                 ispointSelected = True
-                if points[id_target].isSelected():
-                    points[id_target].setSelected(False)
+                point_target = vertex.point
+                if point_target.isSelected():
+                    point_target.setSelected(False)
                 else:
-                    points[id_target].setSelected(True)
+                    point_target.setSelected(True)
 
         if not _shiftkey:
             # If shift key is not pressed, unselect all points except
             # the picked one (if there was one selected)
-            for i in range(0, len(points)):
-                if i != id_target:
-                    points[i].setSelected(False)
+            for point in points:
+                if point is not point_target:
+                    point.setSelected(False)
 
         # select segment
         issegmentselected = False
-        id_target = -1
-        dmin = _tol
+        segment_target = None
         segments = self.hemodel.getSegments()
         if self.select_segment and not ispointSelected:
-            for i in range(0, len(segments)):
-                # Compute distance between given point and segment and
-                # update minimum distance
-                xC, yC, d = segments[i].closestPoint(_x, _y)
-                if d < dmin:
-                    dmin = d
-                    id_target = i
+            # Compute distance between given point and the segments
+            # close to it and get the one with minimum distance
+            edge, xC, yC, dist = self.hemodel.closestEdge(_x, _y, _tol)
 
             # Revert selection of picked segment
-            if id_target > -1:
+            if edge is not None:
                 issegmentselected = True
-                if segments[id_target].isSelected():
-                    segments[id_target].setSelected(False)
+                segment_target = edge.segment
+                if segment_target.isSelected():
+                    segment_target.setSelected(False)
                 else:
-                    segments[id_target].setSelected(True)
+                    segment_target.setSelected(True)
 
         if not _shiftkey:
             # If shift key is not pressed, unselect all segments except
             # the picked one (if there was one selected)
-            for i in range(0, len(segments)):
-                if i != id_target:
-                    segments[i].setSelected(False)
+            for segment in segments:
+                if segment is not segment_target:
+                    segment.setSelected(False)
 
         patches = self.hemodel.getPatches()
         if self.select_patch and not ispointSelected and not issegmentselected:
@@ -1680,6 +1990,16 @@ class HeController:
         self.undoredo.end()
         self.isChanged = True
 
+    # sets the meshes of several patches as a single undoable command
+    def setMeshes(self, _patches, _meshes):
+        self.undoredo.begin()
+        for patch, mesh in zip(_patches, _meshes):
+            set_mesh_op = SetMesh(patch, mesh)
+            set_mesh_op.execute()
+            self.undoredo.insertOperation(set_mesh_op)
+        self.undoredo.end()
+        self.isChanged = True
+
     def getNumSelectedSegments(self):
         """Retorna o número de segmentos selecionados no modelo."""
         return len(self.hemodel.selectedEdges())
@@ -1706,10 +2026,9 @@ class HeController:
             segment = edge.segment
             
             # Gera N-1 pontos internos ao longo do segmento
-            for i in range(1, num_pieces):
-                t = i / float(num_pieces)
-                pt = segment.getPoint(t)
-                points_to_add.append(pt)
+            ts = np.arange(1, num_pieces) / float(num_pieces)
+            for x, y in segment.getPointsAt(ts).tolist():
+                points_to_add.append(Point(x, y))
             
             if hasattr(edge, 'segment'):
                 edge.segment.setSelected(False)
@@ -205,12 +205,26 @@ class HeFile():
 
             # Handle attributes
             attributes = face.patch.attributes.copy()
-            if face.patch.mesh is not None:
-                mesh_dict = face.patch.mesh.mesh_dict
+            mesh = face.patch.mesh
+            if mesh is None:
+                mesh_dict = None
+            elif hasattr(mesh, 'mesh_dict'):
+                mesh_dict = mesh.mesh_dict
                 if mesh_dict in attributes:
                     attributes.remove(mesh_dict)
             else:
-                mesh_dict = None
+                # mesh stored as (points, connectivity), either as lists
+                # or as arrays
+                pts, conn = mesh
+                if hasattr(pts, 'tolist'):
+                    pts = [pt[:2] for pt in pts.tolist()]
+                else:
+                    pts = [[pt.getX(), pt.getY()] for pt in pts]
+                if hasattr(conn, 'tolist'):
+                    conn = conn.tolist()
+                else:
+                    conn = [[int(i) for i in elem] for elem in conn]
+                mesh_dict = {'points': pts, 'conn': conn}
 
             # Save remaining attributes as full dictionaries
             attributes_data = [att.copy() for att in attributes]
@@ -332,6 +346,12 @@ class HeFile():
             else:
                 face.patch.attributes = []
 
+            # set patch mesh
+            mesh_dict = face_dict['attributes'].get('mesh')
+            if mesh_dict is not None and 'points' in mesh_dict:
+                pts = [Point(x, y) for x, y in mesh_dict['points']]
+                face.patch.setMesh(pts, mesh_dict['conn'])
+
             # creates a key for the face
             face_dict['face'] = face
 
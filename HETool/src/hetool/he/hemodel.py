@@ -1,6 +1,9 @@
-from hetool.compgeom.compgeom import CompGeom
+from hetool.compgeom.spatialgrid import SpatialGrid
+from hetool.he.indexedlist import IndexedList
 from hetool.geometry.point import Point
 from hetool.geometry.segments.polyline import Polyline
+from collections import deque
+import math
 
 
 class HeModel:
@@ -8,25 +11,40 @@ class HeModel:
     def __init__(self):
         self.shell = None
         self.infinityFace = None
-        self.segments = []
-        self.points = []
+        self.segments = IndexedList()
+        self.points = IndexedList()
         self.patches = []
         self.updateSortPatches = False
+        self.vertexGrid = SpatialGrid()
+        self.edgeGrid = SpatialGrid()
+        self.faceGrid = SpatialGrid()
+        self.changedFaces = set()
+        self.revision = 0  # increased by every change of the model entities
 
     def insertShell(self, _shell):
         self.shell = _shell
 
     def insertVertex(self, _vertex):
+        self.revision += 1
         self.shell.insertVertex(_vertex)
         self.points.append(_vertex.point)
         _vertex.point.vertex = _vertex
+        x = _vertex.point.getX()
+        y = _vertex.point.getY()
+        self.vertexGrid.insert(_vertex, x, x, y, y)
+        self.markVertexFace(_vertex)
 
     def insertEdge(self, _edge):
+        self.revision += 1
         self.shell.insertEdge(_edge)
         self.segments.append(_edge.segment)
         _edge.segment.edge = _edge
+        xmin, xmax, ymin, ymax = _edge.segment.getBoundBox()
+        self.edgeGrid.insert(_edge, xmin, xmax, ymin, ymax)
+        self.markEdgeFaces(_edge)
 
     def insertFace(self, _face):
+        self.revision += 1
 
         if len(self.shell.faces) == 0:
             self.infinityFace = _face
@@ -34,24 +52,34 @@ class HeModel:
         self.shell.insertFace(_face)
         _face.patch.face = _face
         self.updateSortPatches = True
+        self.markFace(_face)
+        self.updateFaceBox(_face)
 
     def removeVertex(self, _vertex):
+        self.revision += 1
+        self.markVertexFace(_vertex)
         _vertex.point.vertex = None
         self.shell.removeVertex(_vertex)
         self.points.remove(_vertex.point)
+        self.vertexGrid.remove(_vertex)
 
     def removeFace(self, _face):
+        self.revision += 1
         if _face == self.infinityFace:
             self.infinityFace = None
 
         self.shell.removeFace(_face)
         _face.patch.face = None
         self.updateSortPatches = True
+        self.faceGrid.remove(_face)
 
     def removeEdge(self, _edge):
+        self.revision += 1
+        self.markEdgeFaces(_edge)
         self.shell.removeEdge(_edge)
         self.segments.remove(_edge.segment)
         _edge.segment.edge = None
+        self.edgeGrid.remove(_edge)
 
     def removeShell(self):
         self.shell = None
@@ -65,10 +93,70 @@ class HeModel:
     def clearAll(self):
         self.shell = None
         self.infinityFace = None
-        self.segments = []
-        self.points = []
+        self.segments = IndexedList()
+        self.points = IndexedList()
         self.patches = []
         self.updateSortPatches = False
+        self.vertexGrid.clear()
+        self.edgeGrid.clear()
+        self.faceGrid.clear()
+        self.changedFaces = set()
+        self.revision += 1
+
+    def markVertexFace(self, _vertex):
+        # the vertex is inserted/removed while it is still attached to
+        #  the half-edge data structure, so its face is known
+        he = _vertex.he
+        if he is not None and he.loop is not None:
+            self.markFace(he.loop.face)
+
+    def markEdgeFaces(self, _edge):
+        for he in [_edge.he1, _edge.he2]:
+            if he is not None and he.loop is not None:
+                self.markFace(he.loop.face)
+
+    def markFace(self, _face):
+        # the geometry revision of the patch is increased so that its
+        #  cached data (e.g. the tessellation) is recomputed
+        self.changedFaces.add(_face)
+        _face.patch.updateRevision()
+
+    def getChangedFaces(self):
+        # returns the faces of the model whose boundaries may have changed since
+        #  the last call, discarding the ones that were removed
+        changedFaces = []
+        for face in self.changedFaces:
+            if face.patch.face == face:
+                changedFaces.append(face)
+
+        self.changedFaces = set()
+
+        # the holes of the changed faces may have changed as well
+        if len(changedFaces) > 0:
+            self.updateSortPatches = True
+
+        return changedFaces
+
+    def updateFaceBox(self, _face):
+        # the bounding box of a face is given by the segments of its boundary,
+        #  so it must be updated whenever the boundary of the face is updated
+        segments = _face.patch.segments
+        if _face == self.infinityFace or len(segments) == 0:
+            self.faceGrid.remove(_face)
+            return
+
+        xmin, xmax, ymin, ymax = segments[0].getBoundBox()
+        for i in range(1, len(segments)):
+            seg_xmin, seg_xmax, seg_ymin, seg_ymax = segments[i].getBoundBox()
+            xmin = min(xmin, seg_xmin)
+            xmax = max(xmax, seg_xmax)
+            ymin = min(ymin, seg_ymin)
+            ymax = max(ymax, seg_ymax)
+
+        self.faceGrid.insert(_face, xmin, xmax, ymin, ymax)
+
+    def getRevision(self):
+        return self.revision
 
     def getPoints(self):
         return self.points
@@ -124,28 +212,25 @@ class HeModel:
         return selectedFaces
 
     def verticesCrossingWindow(self, _xmin, _xmax, _ymin, _ymax):
-        vertices = []
         # search the points that are contained in the given rectangle
-        vertices_list = self.shell.vertices
-        for vertex in vertices_list:
-            if _xmin <= vertex.point.getX() and _xmax >= vertex.point.getX():
-                if _ymin <= vertex.point.getY() and _ymax >= vertex.point.getY():
-                    # then point is in window
-                    vertices.append(vertex)
+        return self.vertexGrid.query(_xmin, _xmax, _ymin, _ymax)
 
-        vertices = list(set(vertices))
+    def edgesOverlappingWindow(self, _xmin, _xmax, _ymin, _ymax):
+        # search the edges whose bounding boxes overlap the given rectangle
+        return self.edgeGrid.query(_xmin, _xmax, _ymin, _ymax)
 
-        return vertices
+    def facesOverlappingWindow(self, _xmin, _xmax, _ymin, _ymax):
+        # search the faces whose bounding boxes overlap the given rectangle
+        return self.faceGrid.query(_xmin, _xmax, _ymin, _ymax)
 
     def edgesInWindow(self, _xmin, _xmax, _ymin, _ymax):
 
         edges_targets = []
 
         # search the edges that are contained in the given rectangle
-        edges_list = self.shell.edges
+        edges_list = self.edgeGrid.query(_xmin, _xmax, _ymin, _ymax)
         for edge in edges_list:
-            edge_segment = edge.segment
-            edg_xmin, edg_xmax, edg_ymin, edg_ymax = edge_segment.getBoundBox()
+            edg_xmin, edg_xmax, edg_ymin, edg_ymax = self.edgeGrid.getBox(edge)
 
             if _xmin <= edg_xmin and _xmax >= edg_xmax:
                 if _ymin <= edg_ymin and _ymax >= edg_ymax:
@@ -161,25 +246,84 @@ class HeModel:
         xmin, xmax, ymin, ymax = _fence.getBoundBox()
 
         # get segments crossing fence's bounding box
-        edges_list = self.shell.edges
-        for edge in edges_list:
-            segment = edge.segment
-            segment_xmin, segment_xmax, segment_ymin, segment_ymax = segment.getBoundBox()
-
-            if not (xmax < segment_xmin or segment_xmax < xmin or
-                    ymax < segment_ymin or segment_ymax < ymin):
-                edges_targets.append(edge)
+        edges_list = self.edgeGrid.query(xmin, xmax, ymin, ymax)
 
         # Checks if the segment intersects the _fence
-        for edge in edges_targets:
+        for edge in edges_list:
             status, pi, param1, param2 = _fence.intersectSegment(edge.segment)
 
-            # If it does not, remove the edge from edgesInFence and go to next edge
-            if not status:
-                edges_targets.remove(edge)
+            if status:
+                edges_targets.append(edge)
 
         return edges_targets
 
+    def verticesNearPoint(self, _pt, _tol):
+        vertices = []
+        tol = Point(_tol, _tol)
+        x = _pt.getX()
+        y = _pt.getY()
+
+        # search the vertices that coincide with the given point
+        candidates = self.vertexGrid.query(x - _tol, x + _tol, y - _tol, y + _tol)
+        for vertex in candidates:
+            if Point.equal(vertex.point, _pt, tol):
+                vertices.append(vertex)
+
+        # keep the order in which the vertices were inserted
+        vertices.sort(key=lambda vertex: vertex.ID)
+
+        return vertices
+
+    def edgesNearPoint(self, _pt, _tol):
+        x = _pt.getX()
+        y = _pt.getY()
+
+        # search the edges whose bounding boxes are within tolerance of the point
+        edges = self.edgeGrid.query(x - _tol, x + _tol, y - _tol, y + _tol)
+
+        # keep the order in which the edges were inserted
+        edges.sort(key=lambda edge: edge.ID)
+
+        return edges
+
+    def closestVertex(self, _x, _y, _tol):
+        vertex_target = None
+        dmin = _tol
+
+        # only the vertices within the tolerance window are checked
+        vertices = self.vertexGrid.query(_x - _tol, _x + _tol, _y - _tol, _y + _tol)
+        vertices.sort(key=lambda vertex: vertex.ID)
+
+        for vertex in vertices:
+            dx = vertex.point.getX() - _x
+            dy = vertex.point.getY() - _y
+            dist = math.sqrt(dx*dx + dy*dy)
+            if dist < dmin:
+                dmin = dist
+                vertex_target = vertex
+
+        return vertex_target, dmin
+
+    def closestEdge(self, _x, _y, _tol):
+        edge_target = None
+        xClst = _x
+        yClst = _y
+        dmin = _tol
+
+        # only the edges whose bounding boxes are within tolerance are checked
+        edges = self.edgeGrid.query(_x - _tol, _x + _tol, _y - _tol, _y + _tol)
+        edges.sort(key=lambda edge: edge.ID)
+
+        for edge in edges:
+            xC, yC, dist = edge.segment.closestPoint(_x, _y)
+            if dist < dmin:
+                xClst = xC
+                yClst = yC
+                dmin = dist
+                edge_target = edge
+
+        return edge_target, xClst, yClst, dmin
+
     def edgesCrossingWindow(self, _xmin, _xmax, _ymin, _ymax):
         pts = []
 
@@ -206,14 +350,17 @@ class HeModel:
         return edges
 
     def whichFace(self, _pt):
-        face = self.infinityFace.next
+        x = _pt.getX()
+        y = _pt.getY()
+
+        # only the faces whose bounding boxes contain the point are checked
+        faces = self.faceGrid.query(x, x, y, y)
+        faces.sort(key=lambda face: face.ID)
 
-        while face is not None:
+        for face in faces:
             if face.patch.isPointInside(_pt):
                 return face
 
-            face = face.next
-
         return self.infinityFace
 
     def sortPatches(self):
@@ -223,37 +370,61 @@ class HeModel:
         # initially the faces are organized in two lists of faces with holes
         #  and patches without holes
         faces = self.shell.faces
-        for i in range(1, len(faces)):
-            if len(faces[i].patch.holes) > 0:
-                facesWithHoles.append(faces[i])
+        for face in faces:
+            if face == self.infinityFace:
+                continue
+            if len(face.patch.holes) > 0:
+                facesWithHoles.append(face)
             else:
-                patchesWithoutHoles.append(faces[i].patch)
+                patchesWithoutHoles.append(face.patch)
 
-        sort_patches = []
+        # From this point on, the faces with holes are sorted from the outermost
+        #  to the innermost one, according to their nesting depth in the tree of
+        #  faces given by the loops of the half-edge data structure
+        depth = self.facesDepth()
+        facesWithHoles.sort(key=lambda face: depth.get(face, 0))
 
-        # From this point on, the list of faces with holes is searched looking
-        #  for the outermost face. Then the outermost face is added to the new
-        #  list of patches with holes
-        while len(facesWithHoles) > 0:
-            insert = True
-            face_target = facesWithHoles[0]
-            for j in range(1, len(facesWithHoles)):
-                face_point = face_target.loop.he.vertex.point
-                poly = facesWithHoles[j].patch.getPoints()
-
-                if CompGeom.isPointInPolygon(poly, face_point):
-                    insert = False
-                    break
-
-            if insert:
-                sort_patches.append(face_target.patch)
-                facesWithHoles.pop(0)
-            else:
-                facesWithHoles.pop(0)
-                facesWithHoles.append(face_target)
+        sort_patches = []
+        for face in facesWithHoles:
+            sort_patches.append(face.patch)
 
         sort_patches.extend(patchesWithoutHoles)
 
         self.updateSortPatches = False
 
         return sort_patches
+
+    def facesDepth(self):
+        # The faces are traversed in breadth-first order starting at the
+        #  infinite face. A face reached across an internal loop is one level
+        #  deeper than the current face, while a face reached across the
+        #  external loop is at the same level (the enclosing face of a
+        #  component is always reached before the faces of the component)
+        depth = {self.infinityFace: 0}
+        queue = deque([self.infinityFace])
+
+        while len(queue) > 0:
+            face = queue.popleft()
+            loop = face.loop
+
+            while loop is not None:
+                if loop == face.loop and face != self.infinityFace:
+                    level = depth[face]
+                else:
+                    level = depth[face] + 1
+
+                he_begin = loop.he
+                he = he_begin
+                while he is not None:
+                    adjFace = he.mate().loop.face
+                    if adjFace not in depth:
+                        depth[adjFace] = level
+                        queue.append(adjFace)
+
+                    he = he.next
+                    if he == he_begin:
+                        break
+
+                loop = loop.next
+
+        return depth
@@ -48,17 +48,14 @@ class HeView:
     def getEntityAttributes(self, _entity):
         return _entity.attributes
 
+    # the mesh of a patch is a (points, connectivity) pair
     def getMeshPoints(self, _patch):
         if _patch.mesh is not None:
-            return _patch.mesh.model.getPoints()
-
-    def getMeshSegments(self, _patch):
-        if _patch.mesh is not None:
-            return _patch.mesh.model.getSegments()
+            return _patch.mesh[0]
 
     def getMeshPatches(self, _patch):
         if _patch.mesh is not None:
-            return _patch.mesh.model.getPatches()
+            return _patch.mesh[1]
 
     def getBoundBox(self):
 
@@ -96,24 +93,13 @@ class HeView:
         if self.isEmpty():
             return False, _x, _y
 
-        xClst = _x
-        yClst = _y
-        id_target = -1
-        dmin = _tol
+        edge, xClst, yClst, dmin = self.hemodel.closestEdge(_x, _y, _tol)
 
-        for i in range(0, len(self.hemodel.segments)):
-            xC, yC, dist = self.hemodel.segments[i].closestPoint(_x, _y)
-            if dist < dmin:
-                xClst = xC
-                yClst = yC
-                dmin = dist
-                id_target = i
-
-        if id_target < 0:
-            return False, xClst, yClst
+        if edge is None:
+            return False, _x, _y
 
         # try to attract to a corner of the segment
-        seg_pts = self.hemodel.segments[id_target].getPoints()
+        seg_pts = edge.segment.getPoints()
 
         dmin = _tol*2
         for pt in seg_pts:
@@ -133,28 +119,13 @@ class HeView:
         if self.isEmpty():
             return False, _x, _y
 
-        xClst = _x
-        yClst = _y
-        id_target = -1
-        dmin = _tol
+        vertex, dmin = self.hemodel.closestVertex(_x, _y, _tol)
 
-        points = self.hemodel.points
-        for i in range(0, len(points)):
-            xC = points[i].getX()
-            yC = points[i].getY()
-            if (abs(_x - xC) < _tol) and (abs(_y - yC) < _tol):
-                d = math.sqrt((_x-xC)*(_x-xC)+(_y-yC)*(_y-yC))
-                if d < dmin:
-                    xClst = xC
-                    yClst = yC
-                    dmin = d
-                    id_target = i
-
-        if id_target < 0:
-            return False, xClst, yClst
+        if vertex is None:
+            return False, _x, _y
 
         # If found a closest point, return its coordinates
-        return True, xClst, yClst
+        return True, vertex.point.getX(), vertex.point.getY()
 
     def getIncidentSegmentsFromPoint(self, _point):
         incidentEdges = _point.vertex.incidentEdges()
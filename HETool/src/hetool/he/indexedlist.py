@@ -0,0 +1,85 @@
+# Marks the position of a removed item until the list is compacted
+_HOLE = object()
+
+
+# Sequence that keeps the position of each of its items, so that an item can
+# be removed in constant time. The removed item leaves a hole in its place,
+# and the holes are only squeezed out when they are many or when an item is
+# accessed by index, so the insertion order of the items is preserved.
+# Items are identified by identity. Its contents may only be changed by
+# append, remove and clear.
+class IndexedList:
+
+    def __init__(self, _items=()):
+        self.items = []
+        self.positions = {}
+        self.holes = 0
+        for item in _items:
+            self.append(item)
+
+    def append(self, _item):
+        self.positions[id(_item)] = len(self.items)
+        self.items.append(_item)
+
+    def remove(self, _item):
+        index = self.positions.pop(id(_item), None)
+        if index is None:
+            raise ValueError('IndexedList.remove(x): x not in list')
+
+        if index == len(self.items) - 1:
+            # the holes left at the end are dropped as well, so the last
+            #  item can always be read without compacting the list
+            self.items.pop()
+            while len(self.items) > 0 and self.items[-1] is _HOLE:
+                self.items.pop()
+                self.holes -= 1
+        else:
+            self.items[index] = _HOLE
+            self.holes += 1
+            if 2 * self.holes > len(self.items):
+                self.compact()
+
+    def clear(self):
+        self.items = []
+        self.positions.clear()
+        self.holes = 0
+
+    def compact(self):
+        if self.holes == 0:
+            return
+
+        # a new list is built, so that an iteration in progress over the
+        #  old one is not disturbed
+        self.items = [item for item in self.items if item is not _HOLE]
+        self.positions = {id(item): i for i, item in enumerate(self.items)}
+        self.holes = 0
+
+    def index(self, _item):
+        if id(_item) not in self.positions:
+            raise ValueError('IndexedList.index(x): x not in list')
+        self.compact()
+        return self.positions[id(_item)]
+
+    def __len__(self):
+        return len(self.items) - self.holes
+
+    def __iter__(self):
+        for item in self.items:
+            if item is not _HOLE:
+                yield item
+
+    def __reversed__(self):
+        for item in reversed(self.items):
+            if item is not _HOLE:
+                yield item
+
+    def __contains__(self, _item):
+        return id(_item) in self.positions
+
+    def __getitem__(self, _index):
+        if _index != -1:
+            self.compact()
+        return self.items[_index]
+
+    def __repr__(self):
+        return 'IndexedList(%r)' % list(self)
@@ -1,11 +1,14 @@
+from hetool.he.indexedlist import IndexedList
+
+
 # Shell class declaration
 class Shell:
 
     def __init__(self, face=None):
         self.face = face
-        self.vertices = []
-        self.edges = []
-        self.faces = []
+        self.vertices = IndexedList()
+        self.edges = IndexedList()
+        self.faces = IndexedList()
         self.num_vertices = 0
         self.num_edges = 0
         self.num_faces = -1
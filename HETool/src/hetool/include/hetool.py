@@ -74,6 +74,26 @@ class Hetool:
         except:
             return False
 
+    # This function tries to insert a set of segments in the model of a given
+    # controller at once. The segments are intersected with each other and with
+    # the model in a single pass, the resulting arrangement is built with the
+    # Euler operators and the whole insertion is recorded as a single undo
+    # command. If the insertion fails, the model is restored.
+    # Input data:
+    #           - _segments: List of segments, each one given as a list containing
+    #                        its coordinates (see insertSegment);
+    #                        Example: _segments = [[0.0,0.0,10.0,0.0],
+    #                                              [5.0,-5.0,5.0,5.0]];
+    #           - _tol: Tolerance used in geometric checks
+    # Output data: Returns a boolean (True or false) indicating whether the segments
+    # were added or not.
+    def insertSegments(_segments, _tol=0.01):
+        try:
+            Hetool.__hecontroller.insertSegments(_segments, _tol)
+            return True
+        except Exception:
+            return False
+
     # This function removes all selected entities from the model.
     def delSelectedEntities():
         Hetool.__hecontroller.delSelectedEntities()
@@ -469,11 +489,14 @@ class Hetool:
     #                     about this class see src\hetool\geometry\Patch;
     # Output data: Returns a list of triangles. Each triangle is represented by another
     # list of three points.
-    # Note 1: To use this function efficiently, get all patches by "getPatches" function
-    # which already returns all ordered regions from the outermost face to the innermost.
-    # This ordering was created to enable the rendering of holes.
+    # Note 1: The triangles do not cover the holes of the patch, and they are kept
+    # by the patch until its boundary changes, so this function can be called at
+    # every redraw.
     # Note 2: To highlight the holes with another color, check if the patch was deleted
     # through the "isDeleted" attribute of the class Patch.
     def tessellate(_patch):
-        pts = _patch.getPoints()
-        return Tesselation.tessellate(pts)
+        pts, indices = _patch.getTessellation()
+        triangs = []
+        for tri in indices:
+            triangs.append([pts[tri[0]], pts[tri[1]], pts[tri[2]]])
+        return triangs
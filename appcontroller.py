@@ -12,8 +12,6 @@ from mesh.meshgenerator import MeshGenerator
 from mesh.meshpatch import MeshPatch
 from mesh.meshsegmentdialog import MeshSegmentDialog
 from mesh.meshpatchdialog import MeshPatchDialog
-from hetool.compgeom.compgeom import CompGeom
-from hetool.geometry.point import Point
 from attributedialog import AttributeDialog
 from attributeviewer import AttributeViewer
 
@@ -401,6 +399,11 @@ class AppController(QMainWindow, Ui_MyApp):
         
         self.meshPatch.setMeshGenerator(type)
         
+        # Por padrão a malha (nós + conectividade) é guardada no patch e
+        # desenhada a partir dele. As arestas só são inseridas no modelo
+        # half-edge se o usuário pedir, e então todas de uma vez.
+        embed = self.meshPatchDialog.checkBoxEmbed.isChecked()
+
         # Obtém patches selecionados
         # Importante: Copiamos a lista porque a inserção de segmentos vai modificar 
         # a lista de patches do modelo (dividindo)
@@ -408,84 +411,64 @@ class AppController(QMainWindow, Ui_MyApp):
         
         he_controller = self.model.getHeController()
 
-        # Lista para armazenar todas as arestas internas a serem criadas
-        # Formato: [(x1, y1, x2, y2), ...]
-        segments_to_insert = []
+        # Malhas geradas: [(patch, pts, conn), ...]
+        meshes = []
 
         for patch in selected_patches:
             patch.setSelected(False)
-            
-            # 1. Configura Loops
-            loops = patch.getMeshLoops()
-            if not self.meshPatch.setLoops(loops):
-                self.popupMessage("Invalid patch configuration.")
-                continue
-            
-            # 2. Obtém Pontos da Fronteira
-            bdryPts = patch.getMeshBdryPoints()
-            
-            # 3. Gera Malha (Pontos e Conectividade)
-            status, pts, conn = self.meshPatch.generateMesh(bdryPts)
-            
+
+        if type == MeshGenerator.DELAUNAY_TRIANGULATION:
+            # 1-3. Uma única triangulação de todos os patches selecionados,
+            # com as fronteiras compartilhadas amostradas uma só vez
+            status, patch_meshes = self.meshPatch.generateModelMeshes(selected_patches)
             if status:
-                # 4. Extrai arestas únicas da malha
-                unique_edges = set()
-                for tri in conn:
-                    # tri = [id0, id1, id2]
-                    for i in range(3):
-                        u = tri[i]
-                        v = tri[(i+1)%3]
-                        # Ordena índices para garantir unicidade (u,v) == (v,u)
-                        if u > v: u, v = v, u
-                        unique_edges.add((u, v))
-                
-                # 5. Filtra arestas: Queremos apenas as INTERNAS
-                # As arestas de contorno já existem no modelo.
-                patch_segments = patch.getSegments()
-                
-                for u, v in unique_edges:
-                    p1 = pts[u]
-                    p2 = pts[v]
-                    
-                    # Calcula ponto médio da aresta candidata
-                    mid_x = (p1.getX() + p2.getX()) / 2.0
-                    mid_y = (p1.getY() + p2.getY()) / 2.0
-                    mid_pt = Point(mid_x, mid_y)
-                    
-                    # Verifica se o ponto médio está muito próximo de algum segmento da borda original
-                    is_boundary = False
-                    for seg in patch_segments:
-                        # Pega pontos do segmento existente
-                        # Assumindo que seg tem getPoint(0) e getPoint(1) ou similar
-                        # O HETool Segment geralmente tem getPoint(t)
-                        s1 = seg.getPoint(0.0)
-                        s2 = seg.getPoint(1.0)
-                        
-                        dist, _, _ = CompGeom.getClosestPointSegment(s1, s2, mid_pt)
-                        if dist < 1e-3: # Tolerância pequena
-                            is_boundary = True
-                            break
-                    
-                    if not is_boundary:
-                        segments_to_insert.append([p1.getX(), p1.getY(), p2.getX(), p2.getY()])
-            else:
+                for patch, mesh in zip(selected_patches, patch_meshes):
+                    if mesh is None:
+                        self.popupMessage("Error generating mesh.")
+                        continue
+                    meshes.append((patch, mesh[0], mesh[1]))
+            elif selected_patches:
                 self.popupMessage("Error generating mesh.")
+        else:
+            for patch in selected_patches:
+                # 1. Configura Loops
+                loops = patch.getMeshLoops()
+                if not self.meshPatch.setLoops(loops):
+                    self.popupMessage("Invalid patch configuration.")
+                    continue
+
+                # 2. Obtém Pontos da Fronteira
+                bdryPts = patch.getMeshBdryPoints()
 
-        # 6. Insere os segmentos no modelo
+                # 3. Gera Malha (Pontos e Conectividade)
+                status, pts, conn = self.meshPatch.generateMeshArrays(bdryPts)
+
+                if status:
+                    meshes.append((patch, pts, conn))
+                else:
+                    self.popupMessage("Error generating mesh.")
+
+        # Lista para armazenar todas as arestas internas a serem criadas
+        # Formato: [[x1, y1, x2, y2], ...]
+        segments_to_insert = []
+
+        if embed:
+            # 4. Arestas internas (compartilhadas por dois elementos);
+            # as arestas de contorno já existem no modelo
+            for patch, pts, conn in meshes:
+                segments_to_insert.extend(
+                    MeshPatch.getInteriorEdges(pts, conn))
+        elif meshes:
+            # 4. Guarda as malhas nos patches, em um único comando de undo/redo
+            he_controller.setMeshes([m[0] for m in meshes],
+                                    [(m[1], m[2]) for m in meshes])
+
+        # 5. Insere os segmentos no modelo em uma única operação
         # Isso efetivamente "corta" as regiões, criando novas faces (patches)
         if segments_to_insert:
-            # Desabilita atualizações visuais parciais para performance
-            # (Se o HETool tiver suporte a batch, seria ideal, mas faremos um loop)
-            count = 0
-            total = len(segments_to_insert)
-            print(f"Inserting {total} edges into the mesh...")
-            
-            for coords in segments_to_insert:
-                he_controller.insertSegment(coords, self.glcanvas.pickTol)
-                count += 1
-                if count%10 == 0:
-                    print(f"Processing...{count}/{total}")
-            self.glcanvas.update()
+            he_controller.insertSegments(segments_to_insert, self.glcanvas.pickTol)
+
+        self.glcanvas.update()
 
     def meshPatchClose(self):
         self.actionDomainMesh.setChecked(False)
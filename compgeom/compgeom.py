@@ -1,9 +1,12 @@
 from compgeom.pnt2d import Pnt2D
+from fractions import Fraction
 
 
 class CompGeom:
 
     ABSTOL = 1e-7  # Absolute tolerance value
+    EPSILON = 2.0 ** -53  # Half of the unit in the last place of 1.0
+    CCWERRBOUND = (3.0 + 16.0 * EPSILON) * EPSILON  # Orientation error bound
 
     # ---------------------------------------------------------------------
     # pickLine: check to see if given point 'pt' touches given line
@@ -103,13 +106,86 @@ class CompGeom:
         return dist, pC, t
 
     # ---------------------------------------------------------------------
+    # Return the oriented twice area formed by three given points.
+    # The floating-point result is returned when its magnitude is larger
+    # than the bound on its rounding error, which is the common case.
+    # Otherwise, the determinant is evaluated exactly, so that the sign of
+    # the returned value is always correct.
+    # Ref.:
+    # J.R. Shewchuk - Adaptive Precision Floating-Point Arithmetic and Fast
+    # Robust Geometric Predicates, Discrete & Computational Geometry,
+    # Vol. 18, pp. 305-363, 1997.
     @staticmethod
     def orient2d(pa, pb, pc):
         acx = pa[0] - pc[0]
         bcx = pb[0] - pc[0]
         acy = pa[1] - pc[1]
         bcy = pb[1] - pc[1]
-        return acx * bcy - acy * bcx
+        detleft = acx * bcy
+        detright = acy * bcx
+        det = detleft - detright
+
+        errbound = CompGeom.CCWERRBOUND * (abs(detleft) + abs(detright))
+        if det > errbound or -det > errbound:
+            return det
+
+        return CompGeom.orient2dExact(pa, pb, pc)
+
+    # ---------------------------------------------------------------------
+    # Evaluate the oriented twice area formed by three given points with
+    # exact rational arithmetic. The result is rounded to the closest float,
+    # but a nonzero result that underflows keeps its sign.
+    @staticmethod
+    def orient2dExact(pa, pb, pc):
+        acx = Fraction(pa[0]) - Fraction(pc[0])
+        bcx = Fraction(pb[0]) - Fraction(pc[0])
+        acy = Fraction(pa[1]) - Fraction(pc[1])
+        bcy = Fraction(pb[1]) - Fraction(pc[1])
+        det = acx * bcy - acy * bcx
+
+        if det == 0:
+            return 0.0
+        value = float(det)
+        if value == 0.0:
+            value = 5e-324 if det > 0 else -5e-324
+        return value
+
+    # ---------------------------------------------------------------------
+    # Return the dot product of the vectors from a given point 'pa' to
+    # the points 'pb' and 'pc', with the same floating-point filter as
+    # orient2d, so that the sign of the returned value is always correct.
+    @staticmethod
+    def dot2d(pa, pb, pc):
+        bax = pb[0] - pa[0]
+        cax = pc[0] - pa[0]
+        bay = pb[1] - pa[1]
+        cay = pc[1] - pa[1]
+        dotleft = bax * cax
+        dotright = bay * cay
+        dot = dotleft + dotright
+
+        errbound = CompGeom.CCWERRBOUND * (abs(dotleft) + abs(dotright))
+        if dot > errbound or -dot > errbound:
+            return dot
+
+        return CompGeom.dot2dExact(pa, pb, pc)
+
+    # ---------------------------------------------------------------------
+    # Evaluate the dot product of dot2d with exact rational arithmetic.
+    @staticmethod
+    def dot2dExact(pa, pb, pc):
+        bax = Fraction(pb[0]) - Fraction(pa[0])
+        cax = Fraction(pc[0]) - Fraction(pa[0])
+        bay = Fraction(pb[1]) - Fraction(pa[1])
+        cay = Fraction(pc[1]) - Fraction(pa[1])
+        dot = bax * cax + bay * cay
+
+        if dot == 0:
+            return 0.0
+        value = float(dot)
+        if value == 0.0:
+            value = 5e-324 if dot > 0 else -5e-324
+        return value
 
     # ---------------------------------------------------------------------
     # Return the sign (NEGATIVE, ZERO, or POSITIVE) of the oriented
@@ -169,26 +245,21 @@ class CompGeom:
     # ---------------------------------------------------------------------
     # Return the sign (NEGATIVE, ZERO, or POSITIVE) of the oriented
     # twice area formed by three given points.
-    # This function uses conventional floating-point operations to
-    # compute the area and compares the area result with a hard-coded
-    # very small tolerance value (ABSTOL).
+    # The sign is the exact one given by orient2d: only truly collinear
+    # points are classified as ZERO. Points that are close to each other or
+    # to a segment must be merged by the caller, with its own tolerance.
     @staticmethod
     def signArea2d(_p1, _p2, _p3):
-        det = Pnt2D.area2d(_p1, _p2, _p3)
-        if abs(det) < CompGeom.ABSTOL:
-            return 'ZERO'
-        if det > 0.0:
-            return 'POSITIVE'
-        return 'NEGATIVE'
+        return CompGeom.signOrient2d(_p1, _p2, _p3)
 
     # ---------------------------------------------------------------------
     # Return the signed value of the oriented twice area formed by
     # three given points.
-    # This function uses conventional floating-point operations to
-    # compute the signed area.
+    # The value is the one given by orient2d, so that its sign is always
+    # the one returned by signArea2d.
     @staticmethod
     def valArea2d(_p1,  _p2, _p3):
-        return Pnt2D.area2d(_p1, _p2, _p3)
+        return CompGeom.valOrient2d(_p1, _p2, _p3)
 
      # ---------------------------------------------------------------------
    # Check for collinear segments 'p1'-'p2' and 'p3'-'p4'.
@@ -311,20 +382,30 @@ class CompGeom:
     # Its main use is to classify the points of two collinear segments,
     # but it may be used to classify points projected on the infinite line
     # that contains a segment.
+    # The position is classified with the exact signs of dot products, so
+    # a point is only at an end point of the segment when its projection
+    # coincides with it.
     @staticmethod
     def getPtPosWrtSegment(_p1, _p2, _p):
+        p1 = [_p1.getX(), _p1.getY()]
+        p2 = [_p2.getX(), _p2.getY()]
+        p = [_p.getX(), _p.getY()]
+        dot1 = CompGeom.dot2d(p1, p2, p)
+        dot2 = CompGeom.dot2d(p2, p1, p)
+
+        if dot1 == 0.0:
+            return 'START_SEG', 0.0  # At start point of segment
+        elif dot2 == 0.0:
+            return 'END_SEG', 1.0   # At end point of segment
+
         v12 = _p2 - _p1
         v1p = _p - _p1
         # Get parametric value of project point on segment line
         _t = Pnt2D.dotprod(v12, v1p) / Pnt2D.sizesquare(v12)
 
-        if abs(_t) < CompGeom.ABSTOL:
-            return 'START_SEG', _t  # At start point of segment
-        elif abs(_t-1.0) < CompGeom.ABSTOL:
-            return 'END_SEG', _t   # At end point of segment
-        elif _t < 0.0:
+        if dot1 < 0.0:
             return 'BEFORE_SEG', _t   # Outside and before segment
-        elif _t > 1.0:
+        elif dot2 < 0.0:
             return 'AFTER_SEG', _t   # Outside and after segment
         return 'INSIDE_SEG', _t   # Inside segment
 
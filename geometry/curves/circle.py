@@ -1,5 +1,6 @@
 from hetool.geometry.point import Point
 from geometry.curves.curve import Curve
+import numpy as np
 import math
 
 class Circle(Curve):
@@ -43,4 +44,12 @@ class Circle(Curve):
             px = self.center.getX() + self.radius * math.cos(theta)
             py = self.center.getY() + self.radius * math.sin(theta)
             pts.append(Point(px, py))
-        return pts
\ No newline at end of file
+        return pts
+
+    # Avalia o círculo em um vetor de parâmetros (t = 0 e t = 1 no ângulo 0,
+    # como em getEquivPolyline), retornando um array (n,2)
+    def evalPoints(self, _ts):
+        theta = 2 * np.pi * np.clip(np.asarray(_ts, dtype=float), 0.0, 1.0)
+        x = self.center.getX() + self.radius * np.cos(theta)
+        y = self.center.getY() + self.radius * np.sin(theta)
+        return np.column_stack((x, y))
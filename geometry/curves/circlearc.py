@@ -1,5 +1,6 @@
 from hetool.geometry.point import Point
 from geometry.curves.curve import Curve
+import numpy as np
 import math
 
 class CircleArc(Curve):
@@ -61,4 +62,17 @@ class CircleArc(Curve):
             px = self.center.getX() + self.radius * math.cos(theta)
             py = self.center.getY() + self.radius * math.sin(theta)
             pts.append(Point(px, py))
-        return pts
\ No newline at end of file
+        return pts
+
+    # Avalia o arco em um vetor de parâmetros (do ângulo inicial ao final,
+    # no sentido anti-horário), retornando um array (n,2)
+    def evalPoints(self, _ts):
+        sa = self.startAngle
+        ea = self.endAngle
+        if ea < sa: ea += 2 * math.pi
+
+        t = np.clip(np.asarray(_ts, dtype=float), 0.0, 1.0)
+        theta = sa + (ea - sa) * t
+        x = self.center.getX() + self.radius * np.cos(theta)
+        y = self.center.getY() + self.radius * np.sin(theta)
+        return np.column_stack((x, y))
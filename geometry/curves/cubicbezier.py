@@ -1,5 +1,6 @@
 from hetool.geometry.point import Point
 from geometry.curves.curve import Curve
+import numpy as np
 import math
 
 class CubicBezier(Curve):
@@ -52,4 +53,13 @@ class CubicBezier(Curve):
         c2 = CubicBezier()
         c2.ctrlPts = [p0123, p123, p23, p3]; c2.nPts = 4
         
-        return c1, c2
\ No newline at end of file
+        return c1, c2
+
+    # Avalia a curva em um vetor de parâmetros pela forma de Bernstein,
+    # retornando um array (n,2)
+    def evalPoints(self, _ts):
+        p0, p1, p2, p3 = [np.array([p.getX(), p.getY()]) for p in self.ctrlPts]
+        t = np.clip(np.asarray(_ts, dtype=float), 0.0, 1.0)[:, None]
+        s = 1.0 - t
+        return (s * s * s * p0 + 3.0 * s * s * t * p1 +
+                3.0 * s * t * t * p2 + t * t * t * p3)
@@ -1,4 +1,5 @@
 from hetool.geometry.point import Point
+import numpy as np
 
 class Curve:
     PARAM_TOL = 1e-7
@@ -31,6 +32,16 @@ class Curve:
     def getCtrlPoints(self):
         return self.ctrlPts
 
+    # Avalia a curva em um vetor de parâmetros, retornando um array (n,2).
+    # Implementação padrão ponto a ponto; classes filhas podem vetorizar.
+    def evalPoints(self, _ts):
+        coords = np.empty((len(_ts), 2))
+        for i, t in enumerate(_ts):
+            pt = self.evalPoint(t)
+            coords[i, 0] = pt.getX()
+            coords[i, 1] = pt.getY()
+        return coords
+
     def getXinit(self):
         if self.nPts > 0: return self.ctrlPts[0].getX()
         return 0.0
@@ -3,6 +3,7 @@ from compgeom.pnt2d import Pnt2D
 from compgeom.compgeom import CompGeom
 from geometry.curves.curve import Curve
 import math
+import numpy as np
 
 class Line(Curve):
     def __init__(self, _pts=None):
@@ -61,6 +62,17 @@ class Line(Curve):
         pt, _, _ = self.evalPointSeg(_t)
         return pt
 
+    def evalPoints(self, _ts):
+        ts = np.asarray(_ts, dtype=float)
+        if self.nPts == 0:
+            return np.zeros((len(ts), 2))
+        p0 = np.array([self.pts[0].getX(), self.pts[0].getY()])
+        if self.nPts == 1:
+            return np.tile(p0, (len(ts), 1))
+        p1 = np.array([self.pts[1].getX(), self.pts[1].getY()])
+        t = np.clip(ts, 0.0, 1.0)[:, None]
+        return (1 - t) * p0 + t * p1
+
     def evalPointTangent(self, _t):
         if self.nPts < 2:
             return Pnt2D(0.0, 0.0), Pnt2D(0.0, 0.0)
@@ -2,6 +2,7 @@ from compgeom.pnt2d import Pnt2D
 from compgeom.compgeom import CompGeom
 from geometry.curves.curve import Curve
 import math
+import numpy as np
 from geometry.curves.line import Line
 
 
@@ -137,6 +138,39 @@ class Polyline(Curve):
         pt, _, _ = self.evalPointSeg(_t)
         return pt
 
+    # ---------------------------------------------------------------------
+    # Evaluate the points for an array of parametric values at once.
+    # Returns an (n,2) array of coordinates.
+    def evalPoints(self, _ts):
+        ts = np.asarray(_ts, dtype=float)
+        if self.nPts == 0:
+            return np.zeros((len(ts), 2))
+
+        pts = np.array([[p.getX(), p.getY()] for p in self.pts])
+        coords = np.tile(pts[0], (len(ts), 1))
+        if self.nPts == 1:
+            return coords
+
+        dists = np.hypot(np.diff(pts[:, 0]), np.diff(pts[:, 1]))
+        lengths = np.concatenate(([0.0], np.cumsum(dists)))
+        length = lengths[-1]
+        if length == 0.0:
+            coords[ts >= 1.0] = pts[-1]
+            return coords
+
+        s = ts * length
+        next_id = np.clip(np.searchsorted(lengths, s, side='left'), 1, self.nPts - 1)
+        prev_id = next_id - 1
+        dist = dists[prev_id]
+        loc_t = np.zeros(len(ts))
+        valid = dist != 0.0
+        loc_t[valid] = (s[valid] - lengths[prev_id[valid]]) / dist[valid]
+
+        coords = pts[prev_id] + loc_t[:, None] * (pts[next_id] - pts[prev_id])
+        coords[ts <= 0.0] = pts[0]
+        coords[ts >= 1.0] = pts[-1]
+        return coords
+
     # ---------------------------------------------------------------------
     def evalPointTangent(self, _t):
         pt, seg, loc_t = self.evalPointSeg(_t)
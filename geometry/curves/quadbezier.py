@@ -1,5 +1,6 @@
 from hetool.geometry.point import Point
 from geometry.curves.curve import Curve
+import numpy as np
 import math
 
 class QuadBezier(Curve):
@@ -46,4 +47,12 @@ class QuadBezier(Curve):
         c2 = QuadBezier()
         c2.ctrlPts = [p012, p12, p2]; c2.nPts = 3
 
-        return c1, c2
\ No newline at end of file
+        return c1, c2
+
+    # Avalia a curva em um vetor de parâmetros pela forma de Bernstein,
+    # retornando um array (n,2)
+    def evalPoints(self, _ts):
+        p0, p1, p2 = [np.array([p.getX(), p.getY()]) for p in self.ctrlPts]
+        t = np.clip(np.asarray(_ts, dtype=float), 0.0, 1.0)[:, None]
+        s = 1.0 - t
+        return s * s * p0 + 2.0 * s * t * p1 + t * t * p2
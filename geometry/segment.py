@@ -169,6 +169,10 @@ class Segment():
     def evalPoint(self, _t):
         return self.curve.evalPoint(_t)
 
+    # ---------------------------------------------------------------------
+    def evalPoints(self, _ts):
+        return self.curve.evalPoints(_ts)
+
     # ---------------------------------------------------------------------
     def getXinit(self):
         return self.curve.getXinit()
@@ -3,6 +3,7 @@ from PySide6.QtCore import Signal
 from OpenGL.GL import *
 from OpenGL.GLU import *
 import math
+import numpy as np
 
 import sys
 import os
@@ -13,6 +14,7 @@ if hetool_path not in sys.path:
 from hetool.include.hetool import Hetool
 from he_adapter import HetoolAdapter
 
+from mesh.meshgenerator import MeshGenerator
 from geometry.curves.quadbezier import QuadBezier
 from geometry.curves.cubicbezier import CubicBezier
 from geometry.curves.circle import Circle
@@ -60,6 +62,28 @@ class GLCanvas(QtOpenGLWidgets.QOpenGLWidget):
         self.isSelecting = False
         self.mouseMoveTol = 5
 
+        # Buffers (VBO) com a geometria dos segmentos, refeitos apenas
+        # quando a revisão do modelo muda
+        self.segVboCoords = None
+        self.segVboColors = None
+        self.segFirsts = None
+        self.segCounts = None
+        self.segSelected = None
+        self.segRevision = None
+
+        # Buffers das malhas dos patches: patch -> (revisão da malha, VBO de
+        # coordenadas, VBO de índices das arestas, número de índices)
+        self.meshBuffers = {}
+        self.meshBuffersRevision = None
+
+        # Culling pela janela de visualização: número de entidades desenhadas
+        # e descartadas no último quadro
+        self.symbolCullFac = 3.0
+        self.segIndex = {}
+        self.drawnCount = {}
+        self.culledCount = {}
+        self.resetCullCounters()
+
     def initializeGL(self):
         glClearColor(1.0, 1.0, 1.0, 1.0)
         glDisable(GL_DEPTH_TEST) 
@@ -124,12 +148,8 @@ class GLCanvas(QtOpenGLWidgets.QOpenGLWidget):
 
         glMatrixMode(GL_PROJECTION)
         glLoadIdentity()
-        if self.width <= self.height:
-            aspect = float(self.height) / float(self.width) if self.width > 0 else 1.0
-            glOrtho(self.left, self.right, self.bottom * aspect, self.top * aspect, -1.0, 1.0)
-        else:
-            aspect = float(self.width) / float(self.height) if self.height > 0 else 1.0
-            glOrtho(self.left * aspect, self.right * aspect, self.bottom, self.top, -1.0, 1.0)
+        xmin, xmax, ymin, ymax = self._get_view_window()
+        glOrtho(xmin, xmax, ymin, ymax, -1.0, 1.0)
         glMatrixMode(GL_MODELVIEW)
         glLoadIdentity()
         glClear(GL_COLOR_BUFFER_BIT) 
@@ -138,9 +158,15 @@ class GLCanvas(QtOpenGLWidgets.QOpenGLWidget):
         if self.grid and self.grid.getDisplayInfo():
             self.drawGrid()
 
+        # Entidades cujas caixas envolventes cruzam a janela visível
+        self.resetCullCounters()
+        visible = self._get_visible_entities(0.0)
+
         # 2. Patches (Camada do meio - Preenchimento)
         patches = self._get_patches_safe()
-        
+        self._prune_mesh_buffers(patches)
+        patches = self._cull_entities(patches, visible, 'patches')
+
         if patches:
             valid_patches = [p for p in patches if not p.isDeleted]
             deleted_patches = [p for p in patches if p.isDeleted]
@@ -168,11 +194,11 @@ class GLCanvas(QtOpenGLWidgets.QOpenGLWidget):
                     glColor4f(0.0, 0.8, 0.0, 0.3) # Verde
 
                 # Desenha o fundo colorido do patch
-                self.drawPatchWithTess(self._get_patch_points(patch))
+                self.drawPatchWithTess(patch)
 
                 # Se o patch tiver uma malha gerada, desenha ela por cima
                 if hasattr(patch, 'mesh') and patch.mesh:
-                    self.drawMesh(patch.mesh)
+                    self.drawMesh(patch)
             
             # PASSO B: Desenha Buracos (Branco Opaco)
             glDisable(GL_BLEND)
@@ -187,32 +213,16 @@ class GLCanvas(QtOpenGLWidgets.QOpenGLWidget):
                 
                 if is_unlim:
                     continue
-                self.drawPatchWithTess(self._get_patch_points(patch))
+                self.drawPatchWithTess(patch)
 
         # 3. Segmentos (Camada superior - Linhas)
         segments = self._get_segments_safe()
         if segments:
             glLineWidth(2.0)
-            for seg in segments:
-                if seg.isSelected():
-                    glColor3f(1.0, 0.0, 0.0)
-                else:
-                    glColor3f(0.0, 0.0, 0.0)
-
-                pts = []
-                if hasattr(seg, 'getPointsToDraw'): pts = seg.getPointsToDraw()
-                elif hasattr(seg, 'getPoints'): pts = seg.getPoints()
-                
-                if pts:
-                    glBegin(GL_LINE_STRIP)
-                    for p in pts:
-                        if hasattr(p, 'getX'): glVertex2f(p.getX(), p.getY())
-                        elif hasattr(p, 'x'): glVertex2f(p.x, p.y)
-                        elif isinstance(p, (list, tuple)): glVertex2f(p[0], p[1])
-                    glEnd()
+            self.drawSegments(segments, visible)
 
         # 4. Vértices (Topo - Pontos)
-        points = self._get_points_safe()
+        points = self._cull_entities(self._get_points_safe(), visible, 'points')
         if points:
             glPointSize(8.0)
             glBegin(GL_POINTS)
@@ -332,9 +342,12 @@ class GLCanvas(QtOpenGLWidgets.QOpenGLWidget):
              if world_width > 0:
                  scale = world_width * 0.05
 
+        # Apenas entidades cujos símbolos podem aparecer na janela visível
+        visible = self._get_visible_entities(self.symbolCullFac * scale)
+
         # 2. Atributos de Ponto
         if points:
-            for p in points:
+            for p in self._cull_entities(points, visible, 'attributes'):
                 if hasattr(p, 'attributes'):
                     for att in p.attributes:
                         if att.get('symbol') and att['symbol'] != "None":
@@ -344,7 +357,7 @@ class GLCanvas(QtOpenGLWidgets.QOpenGLWidget):
         # 3. Atributos de Segmento
         segments = self._get_segments_safe()
         if segments:
-            for seg in segments:
+            for seg in self._cull_entities(segments, visible, 'attributes'):
                 if hasattr(seg, 'attributes'):
                     for att in seg.attributes:
                         if att.get('symbol') and att['symbol'] != "None":
@@ -354,7 +367,7 @@ class GLCanvas(QtOpenGLWidgets.QOpenGLWidget):
         # 4. Atributos de Face (Patch)
         patches = self._get_patches_safe()
         if patches:
-            for patch in patches:
+            for patch in self._cull_entities(patches, visible, 'attributes'):
                 if hasattr(patch, 'attributes'):
                     for att in patch.attributes:
                         if att.get('symbol') and att['symbol'] != "None":
@@ -509,6 +522,10 @@ class GLCanvas(QtOpenGLWidgets.QOpenGLWidget):
         glEnd()
 
     def snapToPoint(self, x, y, tol):
+        # O HeView consulta o índice espacial do modelo (evita varrer todos os pontos)
+        if hasattr(self.he_view, 'snapToPoint'):
+            return self.he_view.snapToPoint(x, y, tol)
+
         points = self._get_points_safe()
         if not points: return False, x, y
         snapped = False
@@ -781,7 +798,171 @@ class GLCanvas(QtOpenGLWidgets.QOpenGLWidget):
     def resetGridDisplay(self):
         self.update()
     
-    def drawPatchWithTess(self, points):
+    def _get_view_window(self):
+        # Janela do mundo visível, a mesma usada na projeção ortográfica
+        if self.width <= self.height:
+            aspect = float(self.height) / float(self.width) if self.width > 0 else 1.0
+            return self.left, self.right, self.bottom * aspect, self.top * aspect
+        else:
+            aspect = float(self.width) / float(self.height) if self.height > 0 else 1.0
+            return self.left * aspect, self.right * aspect, self.bottom, self.top
+
+    def resetCullCounters(self):
+        for key in ('patches', 'segments', 'points', 'attributes'):
+            self.drawnCount[key] = 0
+            self.culledCount[key] = 0
+
+    def _get_visible_entities(self, margin):
+        # Consulta o índice espacial do modelo com a janela visível (aumentada
+        # de margin) e retorna o conjunto de pontos, segmentos e patches que a
+        # cruzam (por id, pois Point não é hashable). Retorna None se o modelo
+        # não tiver índice espacial.
+        if not (hasattr(self.he_model, 'facesOverlappingWindow') and
+                hasattr(self.he_model, 'edgesOverlappingWindow') and
+                hasattr(self.he_model, 'verticesCrossingWindow')):
+            return None
+
+        xmin, xmax, ymin, ymax = self._get_view_window()
+        xmin -= margin
+        xmax += margin
+        ymin -= margin
+        ymax += margin
+
+        visible = set()
+        for vertex in self.he_model.verticesCrossingWindow(xmin, xmax, ymin, ymax):
+            visible.add(id(vertex.point))
+        for edge in self.he_model.edgesOverlappingWindow(xmin, xmax, ymin, ymax):
+            visible.add(id(edge.segment))
+        for face in self.he_model.facesOverlappingWindow(xmin, xmax, ymin, ymax):
+            visible.add(id(face.patch))
+        return visible
+
+    def _cull_entities(self, entities, visible, key):
+        # Mantém apenas as entidades visíveis, preservando a ordem (os patches
+        # são desenhados do mais externo para o mais interno)
+        if visible is None or not entities:
+            if entities:
+                self.drawnCount[key] += len(entities)
+            return entities
+
+        culled = [e for e in entities if id(e) in visible]
+        self.drawnCount[key] += len(culled)
+        self.culledCount[key] += len(entities) - len(culled)
+        return culled
+
+    def _get_model_revision(self):
+        if hasattr(self.he_model, 'getRevision'): return self.he_model.getRevision()
+        return None
+
+    def _get_segment_coords(self, seg):
+        pts = []
+        if hasattr(seg, 'getPointsToDraw'): pts = seg.getPointsToDraw()
+        elif hasattr(seg, 'getPoints'): pts = seg.getPoints()
+
+        coords = []
+        for p in pts:
+            if hasattr(p, 'getX'): coords.append((p.getX(), p.getY()))
+            elif hasattr(p, 'x'): coords.append((p.x, p.y))
+            elif isinstance(p, (list, tuple)): coords.append((p[0], p[1]))
+        return coords
+
+    def updateSegmentBuffers(self, segments):
+        # Empacota todos os segmentos em um único array contíguo de coordenadas,
+        # com o primeiro vértice e o número de vértices de cada segmento
+        coords = []
+        firsts = []
+        counts = []
+        self.segIndex = {}
+        for seg in segments:
+            self.segIndex[id(seg)] = len(counts)
+            seg_coords = self._get_segment_coords(seg)
+            firsts.append(len(coords))
+            counts.append(len(seg_coords))
+            coords.extend(seg_coords)
+
+        coords = np.array(coords, dtype=np.float32).reshape(-1, 2)
+        self.segFirsts = np.array(firsts, dtype=np.int32)
+        self.segCounts = np.array(counts, dtype=np.int32)
+
+        if self.segVboCoords is None:
+            self.segVboCoords, self.segVboColors = glGenBuffers(2)
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.segVboCoords)
+        glBufferData(GL_ARRAY_BUFFER, coords.nbytes, coords, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, self.segVboColors)
+        glBufferData(GL_ARRAY_BUFFER, 3 * coords.nbytes // 2, None, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        # força a atualização das cores
+        self.segSelected = None
+
+    def updateSegmentColors(self, selected):
+        # Cor de cada vértice: vermelho para segmentos selecionados, preto para os demais
+        per_vertex = np.repeat(selected, self.segCounts)
+        colors = np.zeros((len(per_vertex), 3), dtype=np.float32)
+        colors[per_vertex, 0] = 1.0
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.segVboColors)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, colors.nbytes, colors)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.segSelected = selected
+
+    def drawSegments(self, segments, visible=None):
+        revision = self._get_model_revision()
+        if (revision is None or revision != self.segRevision or
+                self.segCounts is None or len(self.segCounts) != len(segments)):
+            self.updateSegmentBuffers(segments)
+            self.segRevision = revision
+
+        if len(self.segCounts) == 0 or self.segCounts.sum() == 0:
+            return
+
+        # a seleção muda sem alterar o modelo: apenas o buffer de cores é refeito
+        selected = np.fromiter((seg.isSelected() for seg in segments),
+                               dtype=bool, count=len(segments))
+        if self.segSelected is None or not np.array_equal(selected, self.segSelected):
+            self.updateSegmentColors(selected)
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, self.segVboCoords)
+        glVertexPointer(2, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, self.segVboColors)
+        glColorPointer(3, GL_FLOAT, 0, None)
+
+        # apenas os segmentos visíveis são enviados
+        firsts = self.segFirsts
+        counts = self.segCounts
+        if visible is not None:
+            index = [self.segIndex[i] for i in visible if i in self.segIndex]
+            index.sort()
+            firsts = firsts[index]
+            counts = counts[index]
+        self.drawnCount['segments'] += len(counts)
+        self.culledCount['segments'] += len(self.segCounts) - len(counts)
+
+        if len(counts) > 0:
+            glMultiDrawArrays(GL_LINE_STRIP, firsts, counts, len(counts))
+
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    def drawPatchWithTess(self, patch):
+        # Usa a triangulação guardada no patch, que só é refeita quando a
+        # revisão da geometria do patch muda (pan/zoom reaproveitam os triângulos)
+        if hasattr(patch, 'getTessellation'):
+            pts, triangs = patch.getTessellation()
+            if triangs:
+                glBegin(GL_TRIANGLES)
+                for tri in triangs:
+                    for i in tri:
+                        glVertex2f(pts[i].getX(), pts[i].getY())
+                glEnd()
+                return
+
+        # Fallback: tessellator do GLU sobre o contorno do patch
+        points = self._get_patch_points(patch)
         if not points or len(points) < 3: return
         try:
             tess = gluNewTess()
@@ -801,17 +982,69 @@ class GLCanvas(QtOpenGLWidgets.QOpenGLWidget):
         except Exception as e:
             print(f"Erro no Tessellator: {e}")
 
-    def drawMesh(self, mesh):
-        if not mesh: return
-        pts, conn = mesh
-        glColor3f(0.2, 0.2, 0.2) 
+    def updateMeshBuffers(self, patch):
+        pts, conn = patch.mesh
+        if isinstance(pts, np.ndarray):
+            coords = np.ascontiguousarray(pts[:, :2], dtype=np.float32)
+        else:
+            coords = np.array([(p.getX(), p.getY()) for p in pts],
+                              dtype=np.float32).reshape(-1, 2)
+        edges = MeshGenerator.getMeshEdges(conn)[0].astype(np.uint32)
+
+        buffers = self.meshBuffers.get(patch)
+        if buffers is None:
+            vbo_coords, vbo_edges = glGenBuffers(2)
+        else:
+            vbo_coords, vbo_edges = buffers[1], buffers[2]
+
+        glBindBuffer(GL_ARRAY_BUFFER, vbo_coords)
+        glBufferData(GL_ARRAY_BUFFER, coords.nbytes, coords, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, vbo_edges)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, edges.nbytes, edges, GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+        self.meshBuffers[patch] = (patch.getMeshRevision(), vbo_coords,
+                                   vbo_edges, edges.size)
+
+    def _prune_mesh_buffers(self, patches):
+        # Libera os buffers de malhas removidas ou de patches que não existem mais;
+        # só é preciso verificar quando o modelo ou alguma malha muda. As revisões
+        # das malhas só crescem, então a soma delas muda a cada SetMesh/DelMesh
+        # (inclusive no undo/redo)
+        meshRevision = sum(p.getMeshRevision() for p in patches
+                           if hasattr(p, 'getMeshRevision'))
+        revision = (self._get_model_revision(), meshRevision)
+        if revision[0] is not None and revision == self.meshBuffersRevision:
+            return
+        self.meshBuffersRevision = revision
+
+        alive = set(p for p in patches if getattr(p, 'mesh', None))
+        for patch in list(self.meshBuffers.keys()):
+            if patch not in alive:
+                buffers = self.meshBuffers.pop(patch)
+                glDeleteBuffers(2, [buffers[1], buffers[2]])
+
+    def drawMesh(self, patch):
+        if not patch.mesh: return
+
+        # Os buffers só são refeitos quando SetMesh/DelMesh trocam a malha do patch
+        buffers = self.meshBuffers.get(patch)
+        if buffers is None or buffers[0] != patch.getMeshRevision():
+            self.updateMeshBuffers(patch)
+            buffers = self.meshBuffers[patch]
+
+        if buffers[3] == 0: return
+
+        glColor3f(0.2, 0.2, 0.2)
         glLineWidth(1.0)
-        for tri in conn:
-            p0 = pts[tri[0]]
-            p1 = pts[tri[1]]
-            p2 = pts[tri[2]]
-            glBegin(GL_LINE_LOOP)
-            glVertex2f(p0.getX(), p0.getY())
-            glVertex2f(p1.getX(), p1.getY())
-            glVertex2f(p2.getX(), p2.getY())
-            glEnd()
\ No newline at end of file
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, buffers[1])
+        glVertexPointer(2, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, buffers[2])
+
+        glDrawElements(GL_LINES, buffers[3], GL_UNSIGNED_INT, None)
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_VERTEX_ARRAY)
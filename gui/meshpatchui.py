@@ -1,5 +1,5 @@
 from PySide6.QtCore import (QCoreApplication, QMetaObject, Qt)
-from PySide6.QtWidgets import (QDialogButtonBox, QRadioButton, QVBoxLayout, QGroupBox)
+from PySide6.QtWidgets import (QDialogButtonBox, QRadioButton, QVBoxLayout, QGroupBox, QCheckBox)
 
 class Ui_MeshPatchDialog(object):
     def setupUi(self, MeshPatchDialog):
@@ -28,6 +28,11 @@ class Ui_MeshPatchDialog(object):
         
         self.verticalLayout.addWidget(self.groupBox)
 
+        self.checkBoxEmbed = QCheckBox(MeshPatchDialog)
+        self.checkBoxEmbed.setText("Embed mesh edges in model")
+        self.checkBoxEmbed.setChecked(False)
+        self.verticalLayout.addWidget(self.checkBoxEmbed)
+
         self.buttonBox = QDialogButtonBox(MeshPatchDialog)
         self.buttonBox.setOrientation(Qt.Horizontal)
         self.buttonBox.setStandardButtons(QDialogButtonBox.Apply | QDialogButtonBox.Close)
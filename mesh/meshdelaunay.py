@@ -1,7 +1,8 @@
-from mesh.meshgenerator import MeshGenerator
+from mesh.meshgenerator import MeshGenerator, PointList
 from hetool.geometry.point import Point
 from hetool.compgeom.tesselation import Tesselation
 import triangle as tr
+import numpy as np
 import math
 
 class MeshDelaunay(MeshGenerator):
@@ -30,12 +31,20 @@ class MeshDelaunay(MeshGenerator):
 
     # ---------------------------------------------------------------------
     def generateMesh(self, _bdryPnts):
-        if not self.loops:
+        status, coords, conn = self.generateMeshArrays(_bdryPnts)
+        if not status:
             return False, [], []
+        pts, conn = MeshGenerator.toPointList(coords, conn, Point)
+        return True, pts, conn
+
+    # ---------------------------------------------------------------------
+    # Boundary coordinates, segments and holes are passed to triangle as
+    # arrays, and its output arrays are returned as they are
+    def generateMeshArrays(self, _bdryPnts):
+        if not self.loops:
+            return False, np.zeros((0, 2)), np.zeros((0, 3), dtype=int)
 
-        vertices = []
-        for pt in _bdryPnts:
-            vertices.append([pt.getX(), pt.getY()])
+        vertices = MeshGenerator.getCoordsArray(_bdryPnts)
 
         segments = []
         holes = []
@@ -43,88 +52,58 @@ class MeshDelaunay(MeshGenerator):
 
         for i, loop_size in enumerate(self.loops):
             # Conecta os pontos do loop sequencialmente
-            for j in range(loop_size):
-                u = current_idx + j
-                v = current_idx + (j + 1) % loop_size
-                segments.append([u, v])
+            ids = np.arange(current_idx, current_idx + loop_size)
+            segments.append(np.stack((ids, np.roll(ids, -1)), axis=1))
 
             # Se for um loop interno (i > 0), calcula ponto interno para marcar como buraco
             if i > 0:
-                loop_pts = _bdryPnts[current_idx : current_idx + loop_size]
-                hole_pt = self._get_point_inside(loop_pts)
-                if hole_pt:
-                    holes.append([hole_pt.getX(), hole_pt.getY()])
-                else:
+                loop_coords = vertices[current_idx : current_idx + loop_size]
+                hole_pt = self._get_point_inside(loop_coords)
+                if hole_pt is None:
                     # Fallback de segurança: centróide simples
-                    cx = sum(p.getX() for p in loop_pts) / len(loop_pts)
-                    cy = sum(p.getY() for p in loop_pts) / len(loop_pts)
-                    holes.append([cx, cy])
+                    hole_pt = loop_coords.mean(axis=0)
+                holes.append(hole_pt)
 
             current_idx += loop_size
 
+        segments = np.vstack(segments)
         data = dict(vertices=vertices, segments=segments)
         if holes:
-            data['holes'] = holes
+            data['holes'] = np.array(holes)
 
         # Calcula restrição de área
-        max_seg_len_sq = 0.0
-        current_idx = 0
-        for loop_size in self.loops:
-            for j in range(loop_size):
-                p1 = _bdryPnts[current_idx + j]
-                p2 = _bdryPnts[current_idx + (j + 1) % loop_size]
-                d2 = (p1.getX() - p2.getX())**2 + (p1.getY() - p2.getY())**2
-                if d2 > max_seg_len_sq:
-                    max_seg_len_sq = d2
-            current_idx += loop_size
-        
+        d = vertices[segments[:, 0]] - vertices[segments[:, 1]]
+        max_seg_len_sq = float(np.max(np.einsum('ij,ij->i', d, d)))
+
         max_area = (math.sqrt(3) / 4.0) * max_seg_len_sq
         opts = f'pqa{max_area:.6f}'
 
         try:
             output = tr.triangulate(data, opts)
         except Exception:
-            return False, [], []
+            return False, np.zeros((0, 2)), np.zeros((0, 3), dtype=int)
 
         if 'triangles' not in output:
-            return False, [], []
+            return False, np.zeros((0, 2)), np.zeros((0, 3), dtype=int)
 
-        out_pts = []
-        for v in output['vertices']:
-            out_pts.append(Point(v[0], v[1]))
+        return True, output['vertices'], output['triangles']
 
-        out_conn = output['triangles'].tolist()
-
-        return True, out_pts, out_conn
-
-    def _get_point_inside(self, pts):
+    def _get_point_inside(self, _coords):
         """
         Usa Tesselation para encontrar ponto interno.
-        Converte explicitamente para lista de coordenadas [x,y,z] para evitar erros no wrapper.
+        Retorna o centróide do maior triângulo da triangulação do loop.
         """
-        try:
-            # Converte Point objects para lista de coordenadas puras
-            # Tesselation espera lista de listas ou tuplas
-            coords = [[p.getX(), p.getY(), 0.0] for p in pts]
-            
-            tess = Tesselation()
-            tess.addContour(coords) 
-            
-            # Retorna lista plana de Points [p1, p2, p3, ...] formando triângulos
-            tri_verts = tess.tesselate()
-            
-            if tri_verts and len(tri_verts) >= 3:
-                # Pega o primeiro triângulo gerado pela tesselação
-                p1 = tri_verts[0]
-                p2 = tri_verts[1]
-                p3 = tri_verts[2]
-                
-                # O centróide de qualquer triângulo da tesselação é garantidamente interno ao polígono
-                cx = (p1.getX() + p2.getX() + p3.getX()) / 3.0
-                cy = (p1.getY() + p2.getY() + p3.getY()) / 3.0
-                return Point(cx, cy)
-                
-        except Exception as e:
-            print(f"Erro Tesselation: {e}")
-            
-        return None
\ No newline at end of file
+        triangs = Tesselation.triangleParing(PointList(_coords, Point))
+        if not triangs:
+            return None
+
+        tri = _coords[np.array(triangs)]
+        a = tri[:, 1] - tri[:, 0]
+        b = tri[:, 2] - tri[:, 0]
+        areas = (a[:, 0]*b[:, 1] - a[:, 1]*b[:, 0]) / 2.0
+        best = np.argmax(areas)
+        if areas[best] <= 0.0:
+            return None
+
+        # O centróide de qualquer triângulo da tesselação é garantidamente interno ao polígono
+        return tri[best].mean(axis=0)
@@ -1,3 +1,7 @@
+from compgeom.pnt2d import Pnt2D
+import numpy as np
+
+
 class MeshGenerator():
     TRANSFIN_BILINEAR = 1
     TRANSFIN_TRILINEAR = 2
@@ -8,3 +12,85 @@ class MeshGenerator():
 
     def generateMesh(_bdryPnts):
         pass
+
+    # ---------------------------------------------------------------------
+    # Array version of generateMesh: returns the node coordinates as an
+    # (n, 2) array and the connectivity as an (m, k) index array.
+    # Generators that build the mesh with NumPy override this method.
+    def generateMeshArrays(self, _bdryPnts):
+        status, pts, conn = self.generateMesh(_bdryPnts)
+        if not status:
+            return False, np.zeros((0, 2)), np.zeros((0, 3), dtype=int)
+        return True, MeshGenerator.getCoordsArray(pts), np.array(conn, dtype=int)
+
+    # ---------------------------------------------------------------------
+    # (n, 2) array with the coordinates of a list of points
+    # (or of an array of coordinates)
+    @staticmethod
+    def getCoordsArray(_pnts):
+        if isinstance(_pnts, PointList):
+            return _pnts.coords
+        if isinstance(_pnts, np.ndarray):
+            return np.asarray(_pnts[:, :2], dtype=float)
+        coords = [(pt.getX(), pt.getY()) for pt in _pnts]
+        return np.array(coords, dtype=float).reshape(-1, 2)
+
+    # ---------------------------------------------------------------------
+    # Unique edges of a mesh (triangles, quadrilaterals or mixed elements)
+    # as an (m, 2) index array with u < v, and the number of elements that
+    # share each edge
+    @staticmethod
+    def getMeshEdges(_conn):
+        if isinstance(_conn, np.ndarray):
+            groups = [_conn]
+        else:
+            by_size = {}
+            for elem in _conn:
+                by_size.setdefault(len(elem), []).append(elem)
+            groups = [np.array(elems) for elems in by_size.values()]
+
+        edges = []
+        for elems in groups:
+            if elems.ndim != 2 or elems.shape[1] < 2:
+                continue
+            pairs = np.stack((elems, np.roll(elems, -1, axis=1)), axis=2)
+            edges.append(pairs.reshape(-1, 2))
+
+        if not edges:
+            return np.zeros((0, 2), dtype=int), np.zeros(0, dtype=int)
+
+        edges = np.sort(np.concatenate(edges), axis=1)
+        return np.unique(edges, axis=0, return_counts=True)
+
+    # ---------------------------------------------------------------------
+    # Adapter from the array results to the list-of-points contract
+    # of generateMesh
+    @staticmethod
+    def toPointList(_coords, _conn, _pointClass=Pnt2D):
+        return PointList(_coords, _pointClass), _conn.tolist()
+
+
+# Read-only sequence of points backed by an (n, 2) array of coordinates.
+# The point objects are only created when they are accessed, so callers
+# that use the coordinates directly never pay for them.
+class PointList():
+
+    def __init__(self, _coords, _pointClass=Pnt2D):
+        self.coords = _coords
+        self.pointClass = _pointClass
+
+    def __len__(self):
+        return self.coords.shape[0]
+
+    def __getitem__(self, _index):
+        if isinstance(_index, slice):
+            return PointList(self.coords[_index], self.pointClass)
+        x, y = self.coords[_index].tolist()
+        return self.pointClass(x, y)
+
+    def __iter__(self):
+        for x, y in self.coords.tolist():
+            yield self.pointClass(x, y)
+
+    def tolist(self):
+        return self.coords.tolist()
@@ -0,0 +1,231 @@
+from hetool.compgeom.tesselation import Tesselation
+import triangle as tr
+import numpy as np
+import math
+
+
+class MeshModelDelaunay():
+
+    def __init__(self):
+        self.faces = []
+        self.coords = np.zeros((0, 2))
+        self.segments = np.zeros((0, 2), dtype=int)
+        self.faceMaxLenSq = []
+
+    # ---------------------------------------------------------------------
+    # Number of subdivisions of a segment (attribute "Nsbdvs")
+    @staticmethod
+    def getNumberSdv(_seg):
+        if hasattr(_seg, 'attributes'):
+            for att in _seg.attributes:
+                if att['name'] == "Nsbdvs":
+                    return max(int(att['properties']['Value']), 1)
+        return 1
+
+    # ---------------------------------------------------------------------
+    # Parameters of the nodes of a segment: the uniform subdivisions plus
+    # the corners of a polyline, so that the mesh follows its shape
+    @staticmethod
+    def getSampleParams(_seg):
+        n = MeshModelDelaunay.getNumberSdv(_seg)
+        ts = np.arange(n + 1) / float(n)
+        if hasattr(_seg, 'getArcLengths'):
+            lengths = np.array(_seg.getArcLengths())
+            if len(lengths) > 2 and lengths[-1] > 0.0:
+                ts = np.union1d(ts, lengths / lengths[-1])
+                # drops parameters that only differ by round-off
+                keep = np.concatenate(([True], np.diff(ts) > 1e-9))
+                keep[-1] = True
+                ts = ts[keep]
+                if len(ts) > 2 and ts[-1] - ts[-2] <= 1e-9:
+                    ts = np.delete(ts, -2)
+        return ts
+
+    # ---------------------------------------------------------------------
+    # Half-edges of all loops (outer and internal) of a face, including
+    # the ones of isolated vertices, which have no edge
+    @staticmethod
+    def faceLoopHalfEdges(_face):
+        hes = []
+        loop = _face.loop
+        while loop is not None:
+            he_begin = loop.he
+            he = he_begin
+            while he is not None:
+                hes.append(he)
+                he = he.next
+                if he == he_begin:
+                    break
+            loop = loop.next
+        return hes
+
+    # ---------------------------------------------------------------------
+    # Half-edges of the edges that bound a face
+    @staticmethod
+    def faceHalfEdges(_face):
+        return [he for he in MeshModelDelaunay.faceLoopHalfEdges(_face)
+                if he.edge is not None]
+
+    # ---------------------------------------------------------------------
+    # Isolated vertices inside a face
+    @staticmethod
+    def faceIsolatedVertices(_face):
+        return [he.vertex for he in MeshModelDelaunay.faceLoopHalfEdges(_face)
+                if he.edge is None]
+
+    # ---------------------------------------------------------------------
+    # A point inside the face: centroid of the largest triangle of the
+    # tessellation of its patch
+    @staticmethod
+    def getPointInside(_patch):
+        pts, triangs = _patch.getTessellation()
+        best = None
+        best_area = 0.0
+        for tri in triangs:
+            area = Tesselation.signed_triangle_area(
+                pts[tri[0]], pts[tri[1]], pts[tri[2]])
+            if area > best_area:
+                best = tri
+                best_area = area
+
+        if best is None:
+            return None
+
+        cx = sum(pts[k].getX() for k in best) / 3.0
+        cy = sum(pts[k].getY() for k in best) / 3.0
+        return [cx, cy]
+
+    # ---------------------------------------------------------------------
+    # Collects the boundaries of the faces of the given patches from the
+    # half-edge structure. Each edge is sampled once, even when it is
+    # shared by two faces, and its end points are shared by vertex.
+    # Isolated vertices inside the faces are added as mesh nodes.
+    def setPatches(self, _patches):
+        self.faces = [patch.face for patch in _patches]
+
+        coords = []
+        segments = []
+        vertexIds = {}
+        edgeMaxLenSq = {}
+        nNodes = 0
+
+        for face in self.faces:
+            for he in MeshModelDelaunay.faceHalfEdges(face):
+                edge = he.edge
+                if id(edge) in edgeMaxLenSq:
+                    continue
+
+                seg = edge.segment
+                ts = MeshModelDelaunay.getSampleParams(seg)
+                n = len(ts) - 1
+                samples = seg.getPointsAt(ts)
+
+                # end nodes of the edge are the nodes of its vertices
+                ends = []
+                for t in [0, n]:
+                    vertices = [edge.he1.vertex, edge.he2.vertex]
+                    dists = [(v.point.getX() - samples[t][0])**2 +
+                             (v.point.getY() - samples[t][1])**2 for v in vertices]
+                    vertex = vertices[int(np.argmin(dists))]
+                    if id(vertex) not in vertexIds:
+                        vertexIds[id(vertex)] = nNodes
+                        coords.append([vertex.point.getX(), vertex.point.getY()])
+                        nNodes += 1
+                    ends.append(vertexIds[id(vertex)])
+
+                ids = np.concatenate(([ends[0]], np.arange(nNodes, nNodes + n - 1),
+                                      [ends[1]]))
+                coords.extend(samples[1:n].tolist())
+                nNodes += n - 1
+
+                pairs = np.stack((ids[:-1], ids[1:]), axis=1)
+                segments.append(pairs[pairs[:, 0] != pairs[:, 1]])
+
+                d = np.diff(samples, axis=0)
+                edgeMaxLenSq[id(edge)] = float(np.max(np.einsum('ij,ij->i', d, d)))
+
+            for vertex in MeshModelDelaunay.faceIsolatedVertices(face):
+                if id(vertex) not in vertexIds:
+                    vertexIds[id(vertex)] = nNodes
+                    coords.append([vertex.point.getX(), vertex.point.getY()])
+                    nNodes += 1
+
+        self.coords = np.array(coords, dtype=float).reshape(-1, 2)
+        if segments:
+            self.segments = np.vstack(segments)
+        else:
+            self.segments = np.zeros((0, 2), dtype=int)
+
+        self.faceMaxLenSq = []
+        for face in self.faces:
+            lens = [edgeMaxLenSq[id(he.edge)]
+                    for he in MeshModelDelaunay.faceHalfEdges(face)]
+            self.faceMaxLenSq.append(max(lens) if lens else 0.0)
+
+    # ---------------------------------------------------------------------
+    # Meshes all the faces with a single triangle call. Each face is a
+    # region with its own attribute and area limit; faces that are
+    # neighbours of the meshed ones but were not selected are holes.
+    # Returns one (coords, conn) pair of arrays per patch, or None for a
+    # patch that could not be meshed.
+    def generateMeshes(self, _patches):
+        self.setPatches(_patches)
+        if self.segments.shape[0] == 0:
+            return False, []
+
+        regions = []
+        for k, face in enumerate(self.faces):
+            pt = MeshModelDelaunay.getPointInside(face.patch)
+            if pt is None:
+                # no region point: the face is left out of the mesh
+                continue
+            max_area = (math.sqrt(3) / 4.0) * self.faceMaxLenSq[k]
+            regions.append([pt[0], pt[1], k + 1, max_area])
+
+        if not regions:
+            return False, []
+
+        holes = []
+        selected = set(id(face) for face in self.faces)
+        visited = set()
+        for face in self.faces:
+            for he in MeshModelDelaunay.faceHalfEdges(face):
+                other = he.mate().loop.face
+                if id(other) in selected or id(other) in visited:
+                    continue
+                visited.add(id(other))
+                # the unbounded face has no outer loop
+                if other.loop.he is None:
+                    continue
+                pt = MeshModelDelaunay.getPointInside(other.patch)
+                if pt is not None:
+                    holes.append(pt)
+
+        data = dict(vertices=self.coords, segments=self.segments,
+                    regions=np.array(regions))
+        if holes:
+            data['holes'] = np.array(holes)
+
+        try:
+            output = tr.triangulate(data, 'pqaA')
+        except Exception:
+            return False, []
+
+        if 'triangles' not in output:
+            return False, []
+
+        vertices = output['vertices']
+        triangles = output['triangles']
+        markers = np.rint(output['triangle_attributes'][:, 0]).astype(int)
+
+        # splits the triangles by region and renumbers the nodes of each one
+        meshes = []
+        for k in range(len(self.faces)):
+            tris = triangles[markers == k + 1]
+            if tris.shape[0] == 0:
+                meshes.append(None)
+                continue
+            nodes, conn = np.unique(tris, return_inverse=True)
+            meshes.append((vertices[nodes], conn.reshape(-1, 3)))
+
+        return True, meshes
@@ -2,6 +2,8 @@ from mesh.meshgenerator import MeshGenerator
 from mesh.transfinbilinear import TransfinBilinear
 from mesh.transfintrilinear import TransfinTrilinear
 from mesh.meshdelaunay import MeshDelaunay
+from mesh.meshmodeldelaunay import MeshModelDelaunay
+import numpy as np
 
 
 class MeshPatch():
@@ -39,6 +41,32 @@ class MeshPatch():
             return False, [], []
         
         return self.generator.generateMesh(_bdryPts)
+
+    # Gera a malha como arrays: coordenadas (n, 2) e conectividade (m, k)
+    def generateMeshArrays(self, _bdryPts):
+        if self.generator is None:
+            return False, np.zeros((0, 2)), np.zeros((0, 3), dtype=int)
+
+        return self.generator.generateMeshArrays(_bdryPts)
+
+    # Malha de Delaunay de todos os patches de uma vez (uma chamada ao
+    # triangle), conforme nas fronteiras compartilhadas.
+    # Retorna um par (coordenadas, conectividade) por patch
+    def generateModelMeshes(self, _patches):
+        return MeshModelDelaunay().generateMeshes(_patches)
+
+    @staticmethod
+    def getInteriorEdges(_pts, _conn):
+        # Arestas internas da malha: as que sao compartilhadas por dois
+        # elementos. As arestas de contorno aparecem em um unico elemento
+        # e ja existem no modelo. Retorna [[x1, y1, x2, y2], ...]
+        edges, counts = MeshGenerator.getMeshEdges(_conn)
+        edges = edges[counts > 1]
+        if edges.shape[0] == 0:
+            return []
+
+        coords = MeshGenerator.getCoordsArray(_pts)
+        return np.hstack((coords[edges[:, 0]], coords[edges[:, 1]])).tolist()
     
     """
     def setLoops(self, _loops):
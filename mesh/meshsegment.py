@@ -1,5 +1,6 @@
 from compgeom.pnt2d import Pnt2D
 from geometry.segment import Segment
+import numpy as np
 
 
 class MeshSegment():
@@ -31,48 +32,46 @@ class MeshSegment():
     def getSubdivisionRatio(self):
         return self.ratio
 
+    # Parameters of the internal subdivision points of a segment, in
+    # (0, 1), for the given number of subdivisions and ratio between the
+    # last and the first subdivision lengths
+    @staticmethod
+    def generateSdvParams(_nsdv, _ratio):
+        ratio = 1.0 / _ratio
+        a = (2.0 * ratio) / ((ratio + 1.0) * _nsdv)
+        b = (a * (1.0 - ratio)) / (2.0 * ratio * (_nsdv - 1.0))
+        i = np.arange(1, _nsdv, dtype=float)
+        return a * i + b * i * (i - 1.0)
+
     @staticmethod
     def generateLineSdvPnts(_p1, _p2, _nsdv, _ratio):
         coords = []
-        n_pts = _nsdv-1
-
-        for i in range(0, n_pts):
-            coords.insert(i, Pnt2D())
 
         x0 = _p1.x
         y0 = _p1.y
         x1 = _p2.x
         y1 = _p2.y
 
-        _ratio = 1.0 / _ratio
-        a = (2.0 * _ratio) / ((_ratio + 1.0) * _nsdv)
-        b = (a * (1.0 - _ratio)) / (2.0 * _ratio * (_nsdv - 1.0))
-
-        for i in range(1, _nsdv):
-            v = a * i + b * i * (i - 1.0)
+        for v in MeshSegment.generateSdvParams(_nsdv, _ratio).tolist():
             u = 1.0 - v
-            coords[i-1].x = u * x0 + v * x1
-            coords[i-1].y = u * y0 + v * y1
+            coords.append(Pnt2D(u * x0 + v * x1, u * y0 + v * y1))
 
         return coords
 
     @staticmethod
     def generateSegmentSdvPnts(_segment, _nsdv, _ratio):
-        length = _segment.length()
         coords = []
 
         if _nsdv <= 1 or _ratio == 0.0:
             return coords
 
-        # Calculate as if it were straight to find interpolation parameters
-        r1 = Pnt2D(0.0, 0.0)
-        r2 = Pnt2D(length, 0.0)
-        coords = MeshSegment.generateLineSdvPnts(r1, r2, _nsdv, _ratio)
+        # The points are distributed along the segment as they would be on a
+        # straight line with the same length
+        ts = MeshSegment.generateSdvParams(_nsdv, _ratio)
 
         # Calculate the coordinates of the actual points on the segment
         pts = []
-        for coord in coords:
-            t = coord.x / length
-            pts.append(_segment.evalPoint(t))
+        for x, y in _segment.evalPoints(ts).tolist():
+            pts.append(Pnt2D(x, y))
 
         return pts
@@ -0,0 +1,116 @@
+from mesh.transfintrilinear import TransfinTrilinear
+from compgeom.pnt2d import Pnt2D
+import math
+import timeit
+
+# BENCHMARK OF THE TRILINEAR TRANSFINITE MESH GENERATOR
+# Compares the previous loop implementation, based on Pnt2D arithmetic,
+# with the NumPy implementation of TransfinTrilinear.generateMeshArrays.
+# Run from the application folder with: python -m mesh.transfin_benchmark
+
+
+class LoopTrilinear(TransfinTrilinear):
+
+    # previous implementation of generateMesh, kept as reference
+    def generateMesh(self, _bdryPnts):
+        n = self.n
+        pts = [None] * int((n + 1) * (n + 2) / 2)
+        conn = []
+
+        idBound = 0
+        for j in range(0, n):
+            pts[self.mtxIdsToVecId(0, j)] = _bdryPnts[idBound]
+            idBound += 1
+        for i in range(0, n):
+            pts[self.mtxIdsToVecId(i, n - i)] = _bdryPnts[idBound]
+            idBound += 1
+        for i in range(n, 0, -1):
+            pts[self.mtxIdsToVecId(i, 0)] = _bdryPnts[idBound]
+            idBound += 1
+
+        for i in range(1, n):
+            for j in range(1, n - i):
+                u1 = i / (n - j)
+                p1 = (pts[self.mtxIdsToVecId(0, j)] * (1.0 - u1) +
+                      pts[self.mtxIdsToVecId(n - j, j)] * u1)
+                u2 = j / (n - i)
+                p2 = (pts[self.mtxIdsToVecId(i, 0)] * (1.0 - u2) +
+                      pts[self.mtxIdsToVecId(i, n - i)] * u2)
+                u3 = i / (i + j)
+                p3 = (pts[self.mtxIdsToVecId(0, i + j)] * (1.0 - u3) +
+                      pts[self.mtxIdsToVecId(i + j, 0)] * u3)
+                pts[self.mtxIdsToVecId(i, j)] = (p1 + p2 + p3) * (1.0 / 3.0)
+
+        for i in range(0, n):
+            for j in range(0, n - i):
+                conn.append([self.mtxIdsToVecId(i, j),
+                             self.mtxIdsToVecId(i, j + 1),
+                             self.mtxIdsToVecId(i + 1, j)])
+        for i in range(0, n - 1):
+            for j in range(0, n - i - 1):
+                conn.append([self.mtxIdsToVecId(i + 1, j),
+                             self.mtxIdsToVecId(i + 1, j + 1),
+                             self.mtxIdsToVecId(i, j + 1)])
+
+        def area2(a, b, c):
+            return (b.getX() - a.getX()) * (c.getY() - a.getY()) - \
+                   (b.getY() - a.getY()) * (c.getX() - a.getX())
+
+        a_dom = area2(pts[0], pts[self.mtxIdsToVecId(0, n)],
+                      pts[self.mtxIdsToVecId(n, 0)])
+        dom_sign = 1 if a_dom >= 0 else -1
+        fixed = []
+        for tri in conn:
+            a = area2(pts[tri[0]], pts[tri[1]], pts[tri[2]])
+            if abs(a) <= 1e-12:
+                continue
+            if dom_sign * a < 0:
+                tri[1], tri[2] = tri[2], tri[1]
+            fixed.append(tri)
+
+        return True, pts, fixed
+
+
+def boundaryPoints(n):
+    # curved triangle with corners (0,0), (0,3) and (4,0)
+    corners = [(0.0, 0.0), (0.0, 3.0), (4.0, 0.0), (0.0, 0.0)]
+    pts = []
+    for k in range(3):
+        (x0, y0), (x1, y1) = corners[k], corners[k+1]
+        for s in range(n):
+            t = s / n
+            bulge = 0.2 * math.sin(math.pi * t)
+            pts.append(Pnt2D(x0 + (x1 - x0)*t + bulge, y0 + (y1 - y0)*t + bulge))
+    return pts
+
+
+def measure(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def report(name, n, loop, array):
+    print(f"{name:<28}{n:>8}{loop*1e3:>12.1f}{array*1e3:>12.1f}"
+          f"{loop/array:>10.1f}x")
+
+
+def benchTrilinear(n, repeat):
+    bdryPts = boundaryPoints(n)
+    loop = LoopTrilinear()
+    loop.setLoops([[n, n, n]])
+    array = TransfinTrilinear()
+    array.setLoops([[n, n, n]])
+
+    report("trilinear", n,
+           measure(lambda: loop.generateMesh(bdryPts), repeat),
+           measure(lambda: array.generateMeshArrays(bdryPts), repeat))
+
+
+def main():
+    print(f"{'generator':<28}{'n':>8}{'loop ms':>12}{'array ms':>12}"
+          f"{'speedup':>11}")
+    for n, repeat in [(50, 5), (200, 3), (1000, 1)]:
+        benchTrilinear(n, repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from mesh.meshgenerator import MeshGenerator
-from compgeom.pnt2d import Pnt2D
+import numpy as np
 
 
 class TransfinBilinear(MeshGenerator):
@@ -42,85 +42,55 @@ class TransfinBilinear(MeshGenerator):
 
     # ---------------------------------------------------------------------
     def generateMesh(self, _bdryPnts):
-        pts = []
-        conn = []
+        status, coords, conn = self.generateMeshArrays(_bdryPnts)
+        if not status:
+            return False, [], []
+        pts, conn = MeshGenerator.toPointList(coords, conn)
+        return True, pts, conn
+
+    # ---------------------------------------------------------------------
+    # Computes the whole (nv+1)x(nu+1) Coons grid at once. The nodes are
+    # returned in row major order, as an array with shape ((nv+1)*(nu+1), 2),
+    # together with the (nv*nu, 4) array of quadrilateral elements.
+    def generateMeshArrays(self, _bdryPnts):
+        nu = self.nu
+        nv = self.nv
         # Total number of boundary nodes must be consistent with
         # number of boundary segments
-        if len(_bdryPnts) != (self.nu + self.nv) * 2:
-            return False, pts, conn
-
-        # Allocate point vector in row major order
-        pt = Pnt2D(0.0, 0.0)
-        for i in range(0, self.nv + 1):
-            for j in range(0, self.nu + 1):
-                pts.append(pt)
-
-        # Input nodes from first boundary curve
-        idBound = 0
-        i = 0
-        for j in range(0, self.nu):
-            k = self.mtxIdsToVecId(i, j)
-            pts[k] = _bdryPnts[idBound]
-            idBound += 1
-
-        # Input node from second boundary curve
-        j = self.nu
-        for i in range(0, self.nv):
-            # *** COMPLETE HERE - TRANSFINBILINEAR: 01 ***
-            k = self.mtxIdsToVecId(i, j)
-            pts[k] = _bdryPnts[idBound]
-            idBound += 1
-        # Input node from third boundary curve
-        # *** COMPLETE HERE - TRANSFINBILINEAR: 02 ***
-        i = self.nv
-        for j in range(self.nu, 0, -1):
-            k = self.mtxIdsToVecId(i, j)
-            pts[k] = _bdryPnts[idBound]
-            idBound += 1
-        # Input node from fourth boundary curve
-        # *** COMPLETE HERE - TRANSFINBILINEAR: 03 ***
-        j = 0
-        for i in range(self.nv, 0, -1):
-            k = self.mtxIdsToVecId(i, j)
-            pts[k] = _bdryPnts[idBound]
-            idBound += 1
-        # Generate interior nodes
-        # *** COMPLETE HERE - TRANSFINBILINEAR: 04 ***
-        k_0_0 = self.mtxIdsToVecId(0, 0)
-        k_0_nu = self.mtxIdsToVecId(0, self.nu)
-        k_nv_0 = self.mtxIdsToVecId(self.nv, 0)
-        k_nv_nu = self.mtxIdsToVecId(self.nv, self.nu)
-
-        for i in range(1, self.nv):
-            k_i_0 = self.mtxIdsToVecId(i, 0)
-            k_i_nu = self.mtxIdsToVecId(i, self.nu)
-            
-            v = float(i) / self.nv
-            
-            for j in range(1, self.nu):
-                k_0_j = self.mtxIdsToVecId(0, j)
-                k_nv_j = self.mtxIdsToVecId(self.nv, j)
-                
-                u = float(j) / self.nu
-                
-                k = self.mtxIdsToVecId(i, j)
-                
-                # Bilinear Transfinite Interpolation Formula
-                pts[k] = (pts[k_0_j] * (1.0 - v) + pts[k_nv_j] * v +
-                          pts[k_i_0] * (1.0 - u) + pts[k_i_nu] * u -
-                          (pts[k_0_0] * (1.0 - u) * (1.0 - v) +
-                           pts[k_0_nu] * u * (1.0 - v) +
-                           pts[k_nv_0] * (1.0 - u) * v +
-                           pts[k_nv_nu] * u * v))
-                
+        if nu < 1 or nv < 1 or len(_bdryPnts) != (nu + nv) * 2:
+            return False, np.zeros((0, 2)), np.zeros((0, 4), dtype=int)
+
+        bdry = MeshGenerator.getCoordsArray(_bdryPnts)
+
+        # Boundary nodes of each side of the grid, ordered by increasing
+        # i or j. The boundary points run counterclockwise from node (0, 0):
+        # first side j = 0..nu-1, second side i = 0..nv-1, third side
+        # j = nu..1 and fourth side i = nv..1.
+        bottom = bdry[0:nu + 1]
+        right = bdry[nu:nu + nv + 1]
+        top = bdry[nu + nv:2 * nu + nv + 1][::-1]
+        left = np.vstack((bdry[0:1], bdry[2 * nu + nv:][::-1]))
+
+        u = (np.arange(nu + 1) / nu)[np.newaxis, :, np.newaxis]
+        v = (np.arange(nv + 1) / nv)[:, np.newaxis, np.newaxis]
+
+        # Bilinear Transfinite Interpolation Formula
+        grid = (bottom[np.newaxis, :, :] * (1.0 - v) + top[np.newaxis, :, :] * v +
+                left[:, np.newaxis, :] * (1.0 - u) + right[:, np.newaxis, :] * u -
+                (bottom[0] * (1.0 - u) * (1.0 - v) +
+                 bottom[nu] * u * (1.0 - v) +
+                 top[0] * (1.0 - u) * v +
+                 top[nu] * u * v))
+
+        # Boundary nodes are kept exactly as given
+        grid[0, :] = bottom
+        grid[nv, :] = top
+        grid[:, 0] = left
+        grid[:, nu] = right
+
         # Generate quadrilateral elements
-        # *** COMPLETE HERE - TRANSFINBILINEAR: 05 ***
-        for i in range(0, self.nv):
-            for j in range(0, self.nu):
-                n0 = self.mtxIdsToVecId(i, j)
-                n1 = self.mtxIdsToVecId(i, j + 1)
-                n2 = self.mtxIdsToVecId(i + 1, j + 1)
-                n3 = self.mtxIdsToVecId(i + 1, j)
-                conn.append([n0, n1, n2, n3])
+        ids = np.arange((nv + 1) * (nu + 1)).reshape(nv + 1, nu + 1)
+        conn = np.stack((ids[:-1, :-1], ids[:-1, 1:],
+                         ids[1:, 1:], ids[1:, :-1]), axis=2).reshape(-1, 4)
 
-        return True, pts, conn
+        return True, grid.reshape(-1, 2), conn
@@ -1,5 +1,6 @@
 from mesh.meshgenerator import MeshGenerator
-from compgeom.pnt2d import Pnt2D
+import numpy as np
+
 
 class TransfinTrilinear(MeshGenerator):
 
@@ -42,128 +43,108 @@ class TransfinTrilinear(MeshGenerator):
 
         return True
 
+    # ---------------------------------------------------------------------
+    # Vectorized version of mtxIdsToVecId for arrays of indices
+    def mtxIdsToVecIds(self, _i, _j):
+        return (_i * (2 * self.n - _i + 3)) // 2 + _j
+
+    # ---------------------------------------------------------------------
+    # Row and column indices (i, j), with i + j <= _m, of a triangular
+    # matrix traversed in the storage order of mtxIdsToVecId
+    @staticmethod
+    def triangularIds(_m):
+        rows = np.arange(_m + 1)
+        i = np.repeat(rows, _m + 1 - rows)
+        starts = np.concatenate(([0], np.cumsum(_m + 1 - rows)[:-1]))
+        j = np.arange(i.size) - starts[i]
+        return i, j
+
     # ---------------------------------------------------------------------
     def generateMesh(self, _bdryPnts):
-        if self.n < 1:
+        status, coords, conn = self.generateMeshArrays(_bdryPnts)
+        if not status:
             return False, [], []
+        pts, conn = MeshGenerator.toPointList(coords, conn)
+        return True, pts, conn
 
-        # Total points in a triangular grid of side n is (n+1)(n+2)/2
-        num_points = int((self.n + 1) * (self.n + 2) / 2)
-        pts = [None] * num_points
-        conn = []
-        
+    # ---------------------------------------------------------------------
+    # Computes all the nodes of the triangular grid at once. The nodes are
+    # returned in the order of mtxIdsToVecId, as an array with shape
+    # ((n+1)(n+2)/2, 2), together with the (m, 3) array of triangles.
+    def generateMeshArrays(self, _bdryPnts):
+        n = self.n
         # Total number of boundary nodes must be consistent with
         # number of boundary segments (3 sides * n subdivisions)
-        if len(_bdryPnts) != self.n * 3:
-            return False, [], []
+        if n < 1 or len(_bdryPnts) != n * 3:
+            return False, np.zeros((0, 2)), np.zeros((0, 3), dtype=int)
+
+        bdry = MeshGenerator.getCoordsArray(_bdryPnts)
 
-        # --- 1. Boundary Points Assignment ---
-        idBound = 0
-
-        # Side 1: Left Edge (j varies, i=0)
-        # Corresponds to segment from (0,0) to (0,n)
-        for j in range(0, self.n):
-            k = self.mtxIdsToVecId(0, j)
-            pts[k] = _bdryPnts[idBound]
-            idBound += 1
-
-        # Side 2: Hypotenuse (i varies, i+j=n)
-        # Corresponds to segment from (0,n) to (n,0)
-        for i in range(0, self.n):
-            j = self.n - i
-            k = self.mtxIdsToVecId(i, j)
-            pts[k] = _bdryPnts[idBound]
-            idBound += 1
-
-        # Side 3: Bottom Edge (i varies backwards, j=0)
-        # Corresponds to segment from (n,0) to (0,0)
-        for i in range(self.n, 0, -1):
-            k = self.mtxIdsToVecId(i, 0)
-            pts[k] = _bdryPnts[idBound]
-            idBound += 1
+        # --- 1. Boundary Points ---
+        # Side 1 (left): P(0, j), j = 0..n
+        # Side 2 (hypotenuse): P(i, n-i), i = 0..n
+        # Side 3 (bottom): P(i, 0), i = 0..n
+        left = bdry[0:n + 1]
+        hypot = np.vstack((bdry[n:2 * n], bdry[2 * n:2 * n + 1]))
+        bottom = np.vstack((bdry[0:1], bdry[2 * n:][::-1]))
 
         # --- 2. Interior Points Generation ---
         # Uses a blend of 3 linear interpolations (Coons Patch for Triangle)
-        for i in range(1, self.n):
-            for j in range(1, self.n - i):
-                k = self.mtxIdsToVecId(i, j)
-                
-                # Interpolation 1: Parallel to Side 1 (Left)
-                # Interpolates between P(0, j) and P(n-j, j)
-                den1 = self.n - j
-                u1 = i / den1 if den1 != 0 else 0
-                p1_start = pts[self.mtxIdsToVecId(0, j)]
-                p1_end   = pts[self.mtxIdsToVecId(self.n - j, j)]
-                p1 = p1_start * (1.0 - u1) + p1_end * u1
-
-                # Interpolation 2: Parallel to Side 3 (Bottom)
-                # Interpolates between P(i, 0) and P(i, n-i)
-                den2 = self.n - i
-                u2 = j / den2 if den2 != 0 else 0
-                p2_start = pts[self.mtxIdsToVecId(i, 0)]
-                p2_end   = pts[self.mtxIdsToVecId(i, self.n - i)]
-                p2 = p2_start * (1.0 - u2) + p2_end * u2
-
-                # Interpolation 3: Parallel to Side 2 (Hypotenuse)
-                # Interpolates between P(0, i+j) and P(i+j, 0)
-                den3 = i + j
-                u3 = i / den3 if den3 != 0 else 0
-                p3_start = pts[self.mtxIdsToVecId(0, i + j)]
-                p3_end   = pts[self.mtxIdsToVecId(i + j, 0)]
-                p3 = p3_start * (1.0 - u3) + p3_end * u3
-
-                # Average the 3 interpolations
-                pts[k] = (p1 + p2 + p3) * (1.0 / 3.0)
-  
+        i, j = TransfinTrilinear.triangularIds(n)
+        pts = np.empty((i.size, 2))
+        inner = (i > 0) & (j > 0) & (i + j < n)
+        ii = i[inner]
+        jj = j[inner]
+
+        # Interpolation 1: Parallel to Side 1, between P(0, j) and P(n-j, j)
+        u1 = (ii / (n - jj))[:, np.newaxis]
+        p1 = left[jj] * (1.0 - u1) + hypot[n - jj] * u1
+
+        # Interpolation 2: Parallel to Side 3, between P(i, 0) and P(i, n-i)
+        u2 = (jj / (n - ii))[:, np.newaxis]
+        p2 = bottom[ii] * (1.0 - u2) + hypot[ii] * u2
+
+        # Interpolation 3: Parallel to Side 2, between P(0, i+j) and P(i+j, 0)
+        u3 = (ii / (ii + jj))[:, np.newaxis]
+        p3 = left[ii + jj] * (1.0 - u3) + bottom[ii + jj] * u3
+
+        # Average the 3 interpolations
+        pts[inner] = (p1 + p2 + p3) * (1.0 / 3.0)
+
+        # Boundary nodes are kept exactly as given
+        pts[self.mtxIdsToVecIds(0, np.arange(n + 1))] = left
+        pts[self.mtxIdsToVecIds(np.arange(n + 1), n - np.arange(n + 1))] = hypot
+        pts[self.mtxIdsToVecIds(np.arange(n + 1), 0)] = bottom
+
         # --- 3. Connectivity Generation ---
-        # We generate triangles for both winding orders (CCW and CW) to ensure visibility
-        # regardless of camera or normal orientation (Double Sided).
-        conn.clear()
-        # Família 1: (i,j) -> (i, j+1) -> (i+1, j)  para j = 0..(n-i-1)
-        for i in range(0, self.n):
-            for j in range(0, self.n - i):
-                A = self.mtxIdsToVecId(i, j)
-                B = self.mtxIdsToVecId(i, j + 1)
-                C = self.mtxIdsToVecId(i + 1, j)
-                conn.append([A, B, C])
-
-        # Família 2: (i+1, j) -> (i+1, j+1) -> (i, j+1) para j = 0..(n-i-2)
-        for i in range(0, self.n - 1):
-            for j in range(0, self.n - i - 1):
-                C = self.mtxIdsToVecId(i + 1, j)
-                D = self.mtxIdsToVecId(i + 1, j + 1)
-                B = self.mtxIdsToVecId(i, j + 1)
-                conn.append([C, D, B])
-
-        # --- 4. Força CCW e remove duplicados ---
+        # Family 1: (i,j) -> (i, j+1) -> (i+1, j) for i + j <= n-1
+        i, j = TransfinTrilinear.triangularIds(n - 1)
+        family1 = np.stack((self.mtxIdsToVecIds(i, j),
+                            self.mtxIdsToVecIds(i, j + 1),
+                            self.mtxIdsToVecIds(i + 1, j)), axis=1)
+
+        # Family 2: (i+1, j) -> (i+1, j+1) -> (i, j+1) for i + j <= n-2
+        i, j = TransfinTrilinear.triangularIds(n - 2)
+        family2 = np.stack((self.mtxIdsToVecIds(i + 1, j),
+                            self.mtxIdsToVecIds(i + 1, j + 1),
+                            self.mtxIdsToVecIds(i, j + 1)), axis=1)
+
+        conn = np.vstack((family1, family2.reshape(-1, 3)))
+
+        # --- 4. Forces CCW and skips degenerate triangles ---
+        # orientation of the "master" triangle (0,0) -> (0,n) -> (n,0)
         def area2(a, b, c):
-            return (b.getX() - a.getX()) * (c.getY() - a.getY()) - \
-                   (b.getY() - a.getY()) * (c.getX() - a.getX())
-
-        # orientação do triângulo “mestre” (0,0) -> (0,n) -> (n,0)
-        k00 = self.mtxIdsToVecId(0, 0)
-        k0n = self.mtxIdsToVecId(0, self.n)
-        kn0 = self.mtxIdsToVecId(self.n, 0)
-        a_dom = area2(pts[k00], pts[k0n], pts[kn0])
+            return ((b[..., 0] - a[..., 0]) * (c[..., 1] - a[..., 1]) -
+                    (b[..., 1] - a[..., 1]) * (c[..., 0] - a[..., 0]))
+
+        a_dom = area2(left[0], left[n], bottom[n])
         dom_sign = 1 if a_dom >= 0 else -1
 
-        fixed = []
-        seen = set()
         EPS = 1e-12
-        for tri in conn:
-            p0, p1, p2 = pts[tri[0]], pts[tri[1]], pts[tri[2]]
-            a = area2(p0, p1, p2)
-            # pula triângulos degenerados
-            if abs(a) <= EPS:
-                continue
-            # força orientação compatível com o triângulo mestre
-            if dom_sign * a < 0:
-                tri[1], tri[2] = tri[2], tri[1]
-            key = tuple(tri)
-            if key not in seen:
-                seen.add(key)
-                fixed.append(tri)
-
-        conn = fixed
+        areas = area2(pts[conn[:, 0]], pts[conn[:, 1]], pts[conn[:, 2]])
+        keep = np.abs(areas) > EPS
+        conn = conn[keep]
+        flip = dom_sign * areas[keep] < 0
+        conn[flip] = conn[flip][:, [0, 2, 1]]
+
         return True, pts, conn
- 
\ No newline at end of file